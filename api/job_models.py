@@ -5,10 +5,14 @@ Data models for simulation jobs.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from enum import Enum
-from datetime import datetime
-import uuid
+from datetime import datetime, timezone
+import time
+
+import msgspec
+
+from simulation.config_loader import new_id
 
 
 class JobStatus(str, Enum):
@@ -19,16 +23,30 @@ class JobStatus(str, Enum):
     FAILED = "failed"
 
 
+def iso_timestamp(ns: Optional[int]) -> Optional[str]:
+    """Format a nanosecond epoch timestamp as an ISO 8601 UTC string."""
+    if ns is None:
+        return None
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+
+def _timestamp_ns(value: Union[int, str, None]) -> Optional[int]:
+    """Normalise a stored timestamp (ns int, or ISO string from older runs)."""
+    if value is None or isinstance(value, int):
+        return value
+    return int(datetime.fromisoformat(value).timestamp() * 1e9)
+
+
 @dataclass
 class SimulationJob:
     """Represents a simulation job in the queue."""
-    job_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    job_id: str = field(default_factory=new_id)
     status: JobStatus = JobStatus.PENDING
     
-    # Timestamps
-    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
-    started_at: Optional[str] = None
-    completed_at: Optional[str] = None
+    # Timestamps (nanoseconds since the epoch; formatted only in to_dict)
+    created_at: int = field(default_factory=time.time_ns)
+    started_at: Optional[int] = None
+    completed_at: Optional[int] = None
     
     # Input
     input_params: Dict[str, Any] = field(default_factory=dict)
@@ -43,9 +61,9 @@ class SimulationJob:
         return {
             "job_id": self.job_id,
             "status": self.status.value,
-            "created_at": self.created_at,
-            "started_at": self.started_at,
-            "completed_at": self.completed_at,
+            "created_at": iso_timestamp(self.created_at),
+            "started_at": iso_timestamp(self.started_at),
+            "completed_at": iso_timestamp(self.completed_at),
             "input_params": self.input_params,
             "artifacts": self.artifacts,
             "error_message": self.error_message
@@ -55,16 +73,59 @@ class SimulationJob:
     def from_dict(cls, data: Dict[str, Any]) -> 'SimulationJob':
         """Create job from dictionary."""
         return cls(
-            job_id=data.get("job_id", str(uuid.uuid4())),
+            job_id=data.get("job_id") or new_id(),
             status=JobStatus(data.get("status", "pending")),
-            created_at=data.get("created_at", datetime.now().isoformat()),
-            started_at=data.get("started_at"),
-            completed_at=data.get("completed_at"),
+            created_at=_timestamp_ns(data.get("created_at")) or time.time_ns(),
+            started_at=_timestamp_ns(data.get("started_at")),
+            completed_at=_timestamp_ns(data.get("completed_at")),
             input_params=data.get("input_params", {}),
             result=data.get("result"),
             artifacts=data.get("artifacts", {}),
             error_message=data.get("error_message")
         )
+    
+    def to_record(self) -> 'SimulationJobRecord':
+        """Convert job to its on-disk record."""
+        return SimulationJobRecord(
+            job_id=self.job_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            input_params=self.input_params,
+            artifacts=self.artifacts,
+            error_message=self.error_message
+        )
+    
+    @classmethod
+    def from_record(cls, record: 'SimulationJobRecord') -> 'SimulationJob':
+        """Create job from its on-disk record."""
+        return cls(
+            job_id=record.job_id,
+            status=record.status,
+            created_at=_timestamp_ns(record.created_at),
+            started_at=_timestamp_ns(record.started_at),
+            completed_at=_timestamp_ns(record.completed_at),
+            input_params=record.input_params,
+            artifacts=record.artifacts,
+            error_message=record.error_message
+        )
+
+
+class SimulationJobRecord(msgspec.Struct):
+    """
+    On-disk form of SimulationJob, encoded as msgpack.
+    Mirrors the fields of to_dict() (the full result is not persisted).
+    Timestamps are ns ints; ISO strings are accepted from older records.
+    """
+    job_id: str
+    status: JobStatus
+    created_at: Union[int, str]
+    started_at: Union[int, str, None] = None
+    completed_at: Union[int, str, None] = None
+    input_params: Dict[str, Any] = {}
+    artifacts: Dict[str, str] = {}
+    error_message: Optional[str] = None
 
 
 @dataclass
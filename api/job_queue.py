@@ -4,25 +4,148 @@ Job Queue
 File-based job queue for simulation jobs.
 """
 
+import copy
+import dataclasses
 import json
 import os
+import struct
 import threading
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+import weakref
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 
-from .job_models import SimulationJob, JobStatus
+import msgspec
+
+from .job_models import SimulationJob, SimulationJobRecord, JobStatus
+
+
+# Shared codecs (reused across calls to avoid per-call setup)
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(SimulationJobRecord)
+
+# Number of decoded jobs kept in memory per queue
+JOB_CACHE_SIZE = 1024
+
+# Record framing: magic + payload length + generation, then msgpack,
+# zero-padded to a whole number of blocks so that most status updates rewrite
+# the file in place. The generation is bumped on every save, so an in-place
+# rewrite is noticed even when it leaves the file's mtime unchanged.
+RECORD_MAGIC = b"JRE2"
+RECORD_BLOCK = 4096
+_RECORD_HEADER = struct.Struct(">4sIQ")
+# Framing written by older versions (no generation)
+_LEGACY_MAGIC = b"JREC"
+_LEGACY_HEADER = struct.Struct(">4sI")
+_CAN_PWRITE = hasattr(os, "pwrite")
+
+# Flags for writing a record in one open/write/close with no buffered file
+# object in between. O_CLOEXEC keeps the fd out of simulation subprocesses.
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+
+
+def _write_file(path: str, data: bytes):
+    """Write bytes to path with raw file-descriptor calls."""
+    if os.name != "posix":
+        with open(path, 'wb') as f:
+            f.write(data)
+        return
+    
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _record_size(payload: bytes) -> int:
+    """Size of the framed record for a payload, padded to RECORD_BLOCK."""
+    size = _RECORD_HEADER.size + len(payload)
+    return size + (-size % RECORD_BLOCK)
+
+
+def _frame_record(payload: bytes, generation: int) -> bytes:
+    """Frame an encoded job as a record padded to a multiple of RECORD_BLOCK."""
+    padding = _record_size(payload) - _RECORD_HEADER.size - len(payload)
+    return _RECORD_HEADER.pack(RECORD_MAGIC, len(payload), generation) + payload + bytes(padding)
+
+
+def _unpack_record(raw: bytes) -> SimulationJobRecord:
+    """Decode a framed record (or an unframed one from older versions)."""
+    if raw[:4] == RECORD_MAGIC:
+        _, length, _ = _RECORD_HEADER.unpack_from(raw)
+        start = _RECORD_HEADER.size
+    elif raw[:4] == _LEGACY_MAGIC:
+        _, length = _LEGACY_HEADER.unpack_from(raw)
+        start = _LEGACY_HEADER.size
+    else:
+        return _decoder.decode(raw)
+    return _decoder.decode(raw[start:start + length])
+
+
+def _generation(head: bytes) -> int:
+    """Generation stored in a record header (0 for older framings)."""
+    if len(head) >= _RECORD_HEADER.size and head[:4] == RECORD_MAGIC:
+        return _RECORD_HEADER.unpack_from(head)[2]
+    return 0
+
+
+def _read_generation(path: str) -> int:
+    """Generation of the record at path, or -1 if there is none."""
+    try:
+        with open(path, 'rb') as f:
+            return _generation(f.read(_RECORD_HEADER.size))
+    except FileNotFoundError:
+        return -1
+
+
+def _touch(path: str):
+    """Create an empty marker file."""
+    os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
 
 
 class JobQueue:
     """
     File-based job queue.
-    Jobs are stored as JSON files in the runs directory.
+    Jobs are stored as block-padded msgpack records in the runs directory.
+    With debug=True a human-readable job.json sidecar is written as well.
     """
     
-    def __init__(self, runs_dir: str):
+    def __init__(self, runs_dir: str, debug: bool = False):
         self.runs_dir = runs_dir
+        self.debug = debug
+        # Only guards the wake-up condition; job records are protected per job
         self.lock = threading.Lock()
+        # Signalled whenever a job is submitted so idle workers wake immediately.
+        # Each wake-up bumps _wakeups, so a waiter that snapshots it before
+        # looking for work cannot miss a wake-up sent in between.
+        self._cond = threading.Condition(self.lock)
+        self._wakeups = 0
+        # Per-job update locks, dropped automatically once no thread holds one
+        self._per_job_locks = weakref.WeakValueDictionary()
+        self._locks_guard = threading.Lock()
+        # Open record fds of running jobs, for in-place updates (job_id -> fd)
+        self._fds: Dict[str, int] = {}
+        # Decoded jobs keyed by job_id -> (record version, job), LRU-ordered.
+        # The version is (inode, mtime_ns, generation): a save either replaces
+        # the file or rewrites it in place with the next generation, so any of
+        # them changing means the cached job is stale.
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int, int], SimulationJob]]" = OrderedDict()
+        self._cache_lock = threading.RLock()
         os.makedirs(runs_dir, exist_ok=True)
+        
+        # Index of pending jobs: empty marker files named "{created_at}_{job_id}"
+        # with a zero-padded ns timestamp, so the oldest pending job is the
+        # lexicographically smallest name.
+        self.pending_dir = os.path.join(runs_dir, "_pending")
+        if not os.path.isdir(self.pending_dir):
+            os.makedirs(self.pending_dir, exist_ok=True)
+            self._index_pending_jobs()
+        # Claimed jobs: markers are renamed here from _pending by start_job
+        self.running_dir = os.path.join(runs_dir, "_running")
+        os.makedirs(self.running_dir, exist_ok=True)
     
     def _job_dir(self, job_id: str) -> str:
         """Get directory path for a job."""
@@ -30,113 +153,327 @@ class JobQueue:
     
     def _job_file(self, job_id: str) -> str:
         """Get job metadata file path."""
+        return os.path.join(self._job_dir(job_id), "job.msgpack")
+    
+    def _pending_marker(self, job: SimulationJob) -> str:
+        """Get pending-index marker path for a job."""
+        return os.path.join(self.pending_dir, f"{job.created_at:020d}_{job.job_id}")
+    
+    def _running_marker(self, job: SimulationJob) -> str:
+        """Get running-index marker path for a job."""
+        return os.path.join(self.running_dir, f"{job.created_at:020d}_{job.job_id}")
+    
+    def _remove_markers(self, job: SimulationJob):
+        """Drop a job from the pending/running indexes (no-op if absent)."""
+        for marker in (self._pending_marker(job), self._running_marker(job)):
+            try:
+                os.unlink(marker)
+            except FileNotFoundError:
+                pass
+    
+    def _job_lock(self, job_id: str) -> threading.Lock:
+        """Get the update lock for a single job."""
+        with self._locks_guard:
+            return self._per_job_locks.setdefault(job_id, threading.Lock())
+    
+    def _index_pending_jobs(self):
+        """Build pending markers for jobs created before the index existed."""
+        with os.scandir(self.runs_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('_') or not entry.is_dir():
+                    continue
+                job = self.get_job(entry.name)
+                if job and job.status == JobStatus.PENDING:
+                    _touch(self._pending_marker(job))
+    
+    def _legacy_job_file(self, job_id: str) -> str:
+        """Get JSON metadata file path (debug sidecar / runs from older versions)."""
         return os.path.join(self._job_dir(job_id), "job.json")
     
     def create_job(self, input_params: Dict[str, Any]) -> SimulationJob:
         """Create a new job and add to queue."""
-        with self.lock:
-            job = SimulationJob(input_params=input_params)
+        job = SimulationJob(input_params=input_params)
+        
+        # Create job directory (runs_dir already exists and the id is fresh,
+        # so a single mkdir is enough)
+        os.mkdir(self._job_dir(job.job_id))
+        
+        # Save job metadata, then publish it in the pending index
+        self._save_job(job)
+        _touch(self._pending_marker(job))
+        
+        # Wake any worker waiting for new jobs
+        self.wake_waiters()
+        
+        return job
+    
+    def _save_job(self, job: SimulationJob):
+        """
+        Save job to disk.
+        
+        When the padded record is the same size as the file on disk it is
+        overwritten in place with a single pwrite; otherwise (new job, or a
+        record that grew past a block boundary) the file is atomically
+        replaced. Either way the record carries the next generation. Only
+        the file I/O runs under the job's lock; encoding and the debug
+        sidecar happen outside it.
+        """
+        payload = _encoder.encode(job.to_record())
+        size = _record_size(payload)
+        cached = dataclasses.replace(job, result=None)
+        job_id = job.job_id
+        finished = job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+        
+        with self._job_lock(job_id):
+            fd = self._fds.pop(job_id, None)
+            if fd is None and _CAN_PWRITE:
+                fd = self._open_record(job_id)
             
-            # Create job directory
-            job_dir = self._job_dir(job.job_id)
-            os.makedirs(job_dir, exist_ok=True)
+            if fd is not None and os.fstat(fd).st_size == size:
+                generation = _generation(os.pread(fd, _RECORD_HEADER.size, 0)) + 1
+                os.pwrite(fd, _frame_record(payload, generation), 0)
+                st = os.fstat(fd)
+            else:
+                if fd is not None:
+                    os.close(fd)
+                    fd = None
+                job_file = self._job_file(job_id)
+                generation = _read_generation(job_file) + 1
+                tmp_file = job_file + ".tmp"
+                _write_file(tmp_file, _frame_record(payload, generation))
+                os.replace(tmp_file, job_file)
+                st = os.stat(job_file)
+            version = (st.st_ino, st.st_mtime_ns, generation)
             
-            # Save job metadata
-            self._save_job(job)
+            # Keep the fd only while the job can still change
+            if fd is not None:
+                if finished:
+                    os.close(fd)
+                else:
+                    self._fds[job_id] = fd
             
-            return job
+            # Store what get_job would decode (the result is not persisted)
+            self._cache_put(job_id, version, cached)
+        
+        if self.debug:
+            with open(self._legacy_job_file(job.job_id), 'w') as f:
+                json.dump(job.to_dict(), f, indent=2)
     
-    def _save_job(self, job: SimulationJob):
-        """Save job to disk."""
-        job_file = self._job_file(job.job_id)
-        with open(job_file, 'w') as f:
-            json.dump(job.to_dict(), f, indent=2)
+    def _open_record(self, job_id: str) -> Optional[int]:
+        """Open an existing job record for in-place updates."""
+        try:
+            return os.open(self._job_file(job_id),
+                           os.O_RDWR | getattr(os, "O_CLOEXEC", 0))
+        except FileNotFoundError:
+            return None
+    
+    def _cache_put(self, job_id: str, version: Tuple[int, int, int], job: SimulationJob):
+        """Insert a decoded job into the LRU cache."""
+        with self._cache_lock:
+            self._cache[job_id] = (version, job)
+            self._cache.move_to_end(job_id)
+            if len(self._cache) > JOB_CACHE_SIZE:
+                self._cache.popitem(last=False)
     
     def get_job(self, job_id: str) -> Optional[SimulationJob]:
         """Get job by ID."""
         job_file = self._job_file(job_id)
-        if not os.path.exists(job_file):
+        try:
+            with open(job_file, 'rb') as f:
+                st = os.fstat(f.fileno())
+                head = f.read(_RECORD_HEADER.size)
+                version = (st.st_ino, st.st_mtime_ns, _generation(head))
+                with self._cache_lock:
+                    entry = self._cache.get(job_id)
+                    if entry and entry[0] == version:
+                        self._cache.move_to_end(job_id)
+                        # Callers mutate jobs before saving; keep the cached one intact
+                        return copy.copy(entry[1])
+                
+                job = SimulationJob.from_record(_unpack_record(head + f.read()))
+            self._cache_put(job_id, version, job)
+            return copy.copy(job)
+        except FileNotFoundError:
+            pass
+        
+        # Fall back to JSON metadata written by older versions
+        legacy_file = self._legacy_job_file(job_id)
+        if not os.path.exists(legacy_file):
             return None
         
-        with open(job_file, 'r') as f:
+        with open(legacy_file, 'r') as f:
             data = json.load(f)
         return SimulationJob.from_dict(data)
     
     def update_job(self, job: SimulationJob):
         """Update job status."""
-        with self.lock:
-            self._save_job(job)
+        self._save_job(job)
+    
+    def _pending_markers(self) -> List[str]:
+        """Get pending marker names, oldest first."""
+        with os.scandir(self.pending_dir) as entries:
+            return sorted(entry.name for entry in entries)
+    
+    def _job_for_marker(self, marker: str) -> Optional[SimulationJob]:
+        """Load the job a marker points to, dropping the marker if it is stale."""
+        job_id = marker.split('_', 1)[1]
+        job = self.get_job(job_id)
+        if job and job.status == JobStatus.PENDING:
+            return job
+        
+        try:
+            os.unlink(os.path.join(self.pending_dir, marker))
+        except FileNotFoundError:
+            pass
+        return None
     
     def get_pending_jobs(self) -> List[SimulationJob]:
         """Get all pending jobs (oldest first)."""
         jobs = []
-        
-        if not os.path.exists(self.runs_dir):
-            return jobs
-        
-        for job_id in os.listdir(self.runs_dir):
-            job = self.get_job(job_id)
-            if job and job.status == JobStatus.PENDING:
+        for marker in self._pending_markers():
+            job = self._job_for_marker(marker)
+            if job:
                 jobs.append(job)
-        
-        # Sort by creation time (oldest first)
-        jobs.sort(key=lambda j: j.created_at)
         return jobs
     
     def get_next_pending_job(self) -> Optional[SimulationJob]:
         """Get the oldest pending job."""
-        pending = self.get_pending_jobs()
-        return pending[0] if pending else None
-    
-    def start_job(self, job_id: str) -> Optional[SimulationJob]:
-        """Mark job as running."""
-        with self.lock:
-            job = self.get_job(job_id)
-            if job and job.status == JobStatus.PENDING:
-                job.status = JobStatus.RUNNING
-                job.started_at = datetime.now().isoformat()
-                self._save_job(job)
+        for marker in self._pending_markers():
+            job = self._job_for_marker(marker)
+            if job:
                 return job
         return None
     
+    def start_job(self, job_id: str) -> Optional[SimulationJob]:
+        """
+        Claim a pending job and mark it as running.
+        
+        The claim is an atomic rename of the job's pending marker, so when
+        several workers race for the same job exactly one of them wins.
+        
+        Returns:
+            The running job, or None if it was not pending or another
+            worker claimed it first.
+        """
+        job = self.get_job(job_id)
+        if not job or job.status != JobStatus.PENDING:
+            return None
+        
+        try:
+            os.rename(self._pending_marker(job), self._running_marker(job))
+        except FileNotFoundError:
+            return None
+        
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time_ns()
+        self._save_job(job)
+        return job
+    
+    def claim_pending_jobs(self, max_jobs: int) -> List[SimulationJob]:
+        """
+        Claim up to max_jobs of the oldest pending jobs and mark them running.
+        
+        Takes one snapshot of the pending index and claims markers from it
+        with atomic renames (see start_job); markers lost to another worker
+        are skipped.
+        
+        Returns:
+            The claimed jobs, oldest first.
+        """
+        claimed = []
+        for marker in self._pending_markers():
+            if len(claimed) >= max_jobs:
+                break
+            
+            running_marker = os.path.join(self.running_dir, marker)
+            try:
+                os.rename(os.path.join(self.pending_dir, marker), running_marker)
+            except FileNotFoundError:
+                continue
+            
+            job = self.get_job(marker.split('_', 1)[1])
+            if not job or job.status != JobStatus.PENDING:
+                # Stale marker: the job is gone or already past pending
+                try:
+                    os.unlink(running_marker)
+                except FileNotFoundError:
+                    pass
+                continue
+            
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time_ns()
+            self._save_job(job)
+            claimed.append(job)
+        return claimed
+    
     def complete_job(self, job_id: str, result: Dict[str, Any], 
                      artifacts: Dict[str, str]):
         """Mark job as completed with results."""
-        with self.lock:
-            job = self.get_job(job_id)
-            if job:
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.now().isoformat()
-                job.result = result
-                job.artifacts = artifacts
-                self._save_job(job)
+        job = self.get_job(job_id)
+        if job:
+            job.status = JobStatus.COMPLETED
+            job.completed_at = time.time_ns()
+            job.result = result
+            job.artifacts = artifacts
+            self._save_job(job)
+            self._remove_markers(job)
     
     def fail_job(self, job_id: str, error_message: str):
         """Mark job as failed."""
-        with self.lock:
-            job = self.get_job(job_id)
-            if job:
-                job.status = JobStatus.FAILED
-                job.completed_at = datetime.now().isoformat()
-                job.error_message = error_message
-                self._save_job(job)
+        job = self.get_job(job_id)
+        if job:
+            job.status = JobStatus.FAILED
+            job.completed_at = time.time_ns()
+            job.error_message = error_message
+            self._save_job(job)
+            self._remove_markers(job)
     
     def list_jobs(self, limit: int = 50) -> List[SimulationJob]:
-        """List recent jobs."""
-        jobs = []
+        """
+        List recent jobs, most recently created or replaced first.
         
+        Job directories are ordered by mtime, so only the returned jobs have
+        to be loaded. A directory's mtime moves when a file in it is created
+        or replaced (job creation, a record that outgrew its blocks, output
+        artifacts), not when the record is updated in place with pwrite.
+        """
         if not os.path.exists(self.runs_dir):
-            return jobs
+            return []
+        
+        with os.scandir(self.runs_dir) as entries:
+            # Skip queue bookkeeping directories (_pending, _running)
+            recent = [(entry.stat().st_mtime_ns, entry.name) for entry in entries
+                      if not entry.name.startswith('_') and entry.is_dir()]
+        recent.sort(reverse=True)
         
-        for job_id in os.listdir(self.runs_dir):
+        jobs = []
+        for _, job_id in recent:
+            if len(jobs) == limit:
+                break
             job = self.get_job(job_id)
             if job:
                 jobs.append(job)
-        
-        # Sort by creation time (newest first)
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-        return jobs[:limit]
+        return jobs
     
     def get_job_output_dir(self, job_id: str) -> str:
         """Get output directory for a job."""
         return self._job_dir(job_id)
+    
+    def wakeup_count(self) -> int:
+        """Snapshot to pass to wait_for_job, taken before looking for work."""
+        with self._cond:
+            return self._wakeups
+    
+    def wait_for_job(self, since: int, timeout: Optional[float] = None):
+        """
+        Block until a job is submitted (or woken) after the `since` snapshot,
+        up to timeout seconds. Returns at once if that already happened.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._wakeups != since, timeout=timeout)
+    
+    def wake_waiters(self):
+        """Wake all threads blocked in wait_for_job()."""
+        with self._cond:
+            self._wakeups += 1
+            self._cond.notify_all()
@@ -6,16 +6,21 @@ Flask-based REST API for simulation job management.
 
 import sys
 import os
+import hashlib
+import json
+import mimetypes
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from flask import Flask, request, jsonify, send_from_directory, send_file
-from flask_cors import CORS
+from flask import (Flask, Response, request, jsonify, render_template,
+                   send_from_directory, send_file, stream_with_context)
 
 from api.job_queue import JobQueue
-from api.job_models import JobStatus
+from api.job_models import JobStatus, iso_timestamp
 from api.worker import SimulationWorker
 
 
@@ -23,7 +28,16 @@ from api.worker import SimulationWorker
 app = Flask(__name__, 
             static_folder=os.path.join(project_root, 'web_batch', 'static'),
             template_folder=os.path.join(project_root, 'web_batch', 'templates'))
-CORS(app)
+
+# CORS: any origin may call the API. Origins listed in SIM_CORS_ORIGINS
+# (comma-separated) are echoed back instead of "*". Credentialed requests
+# are not allowed (no Access-Control-Allow-Credentials header is sent).
+CORS_ORIGINS = {origin: origin for origin in
+                filter(None, os.environ.get('SIM_CORS_ORIGINS', '').split(','))}
+CORS_ALLOW_METHODS = 'GET, POST, OPTIONS'
+
+# Behind nginx/Apache, let the front-end server stream artifact files itself
+app.config['USE_X_SENDFILE'] = os.environ.get('SIM_USE_X_SENDFILE') == '1'
 
 # Initialize job queue and worker
 RUNS_DIR = os.path.join(project_root, 'runs')
@@ -31,6 +45,100 @@ job_queue = JobQueue(RUNS_DIR)
 worker = SimulationWorker(job_queue)
 
 
+# Chunk size used when splicing output files into a response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Extra fields added to a status response, by job status
+_STATUS_DECORATORS = {
+    JobStatus.FAILED: lambda job, response: response.__setitem__(
+        "error", job.error_message),
+    JobStatus.COMPLETED: lambda job, response: response.__setitem__(
+        "artifacts", list(job.artifacts.keys())),
+}
+
+
+def _no_decoration(job, response):
+    pass
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+@lru_cache(maxsize=64)
+def _parse_json_file(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a JSON file; mtime_ns is part of the cache key only."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _load_json_file(path: str) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Load a JSON output file through the parse cache.
+    
+    Returns:
+        Tuple of (parsed data, mtime_ns), or ({}, None) if the file is missing.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return {}, None
+    return _parse_json_file(path, mtime_ns), mtime_ns
+
+
+def _wants_embedded_metrics() -> bool:
+    """Check for an "embed=1" parameter on the Accept header."""
+    accept = request.headers.get('Accept', '')
+    return any(param.strip() == 'embed=1' for param in accept.split(';')[1:])
+
+
+def _stream_with_file(envelope: Dict[str, Any], key: str, path: str):
+    """
+    Yield envelope as JSON with the raw contents of a JSON file under key.
+    
+    The file is copied through in chunks rather than parsed and re-encoded.
+    """
+    head = json.dumps(envelope)
+    yield f'{head[:-1]}, "{key}": '
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    except FileNotFoundError:
+        yield '{}'
+    yield '}'
+
+
+# ============================================================================
+# CORS
+# ============================================================================
+
+@app.before_request
+def _cors_preflight():
+    """Answer CORS preflight requests for known routes immediately."""
+    # Unmatched URLs fall through so Flask still answers them with a 404
+    if request.method == 'OPTIONS' and request.url_rule is not None:
+        response = Response(status=204)
+        response.headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+        requested = request.headers.get('Access-Control-Request-Headers')
+        if requested:
+            response.headers['Access-Control-Allow-Headers'] = requested
+        return response
+
+
+@app.after_request
+def _cors_headers(response):
+    """Add CORS headers to every response."""
+    origin = request.headers.get('Origin')
+    if origin:
+        response.headers['Access-Control-Allow-Origin'] = CORS_ORIGINS.get(origin, '*')
+        response.vary.add('Origin')
+    return response
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -80,16 +188,12 @@ def get_job_status(job_id: str):
         "success": True,
         "job_id": job.job_id,
         "status": job.status.value,
-        "created_at": job.created_at,
-        "started_at": job.started_at,
-        "completed_at": job.completed_at
+        "created_at": iso_timestamp(job.created_at),
+        "started_at": iso_timestamp(job.started_at),
+        "completed_at": iso_timestamp(job.completed_at)
     }
     
-    if job.status == JobStatus.FAILED:
-        response["error"] = job.error_message
-    
-    if job.status == JobStatus.COMPLETED:
-        response["artifacts"] = list(job.artifacts.keys())
+    _STATUS_DECORATORS.get(job.status, _no_decoration)(job, response)
     
     return jsonify(response)
 
@@ -99,7 +203,8 @@ def get_job_results(job_id: str):
     """
     Get results of a completed simulation job.
     
-    Response: Full simulation results including metrics
+    Response: Summary plus a link to the metrics file, or the metrics
+    themselves when the client sends "Accept: application/json; embed=1"
     """
     job = job_queue.get_job(job_id)
     
@@ -115,32 +220,42 @@ def get_job_results(job_id: str):
             "error": f"Job is not completed (status: {job.status.value})"
         }), 400
     
-    # Load metrics and summary from disk
+    # Load the summary (parsed once per file version); metrics are never parsed
     output_dir = job_queue.get_job_output_dir(job_id)
-    
-    metrics = {}
-    summary = {}
-    
     metrics_path = os.path.join(output_dir, "metrics.json")
-    if os.path.exists(metrics_path):
-        import json
-        with open(metrics_path, 'r') as f:
-            metrics = json.load(f)
+    summary, summary_mtime = _load_json_file(os.path.join(output_dir, "summary.json"))
+    try:
+        metrics_mtime = os.stat(metrics_path).st_mtime_ns
+    except FileNotFoundError:
+        metrics_mtime = None
+    embed = _wants_embedded_metrics()
     
-    summary_path = os.path.join(output_dir, "summary.json")
-    if os.path.exists(summary_path):
-        import json
-        with open(summary_path, 'r') as f:
-            summary = json.load(f)
+    # Results only change if an output file is rewritten, so polling clients
+    # can revalidate with If-None-Match instead of downloading them again
+    etag = hashlib.blake2b(
+        f"{job_id}-{metrics_mtime}-{summary_mtime}-{embed}".encode()
+    ).hexdigest()[:16]
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        envelope = {
+            "success": True,
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "metrics_url": f"/api/jobs/{job_id}/artifacts/metrics.json",
+            "summary": summary,
+            "artifacts": list(job.artifacts.keys())
+        }
+        if embed:
+            response = Response(
+                stream_with_context(_stream_with_file(envelope, "metrics", metrics_path)),
+                mimetype='application/json')
+        else:
+            response = jsonify(envelope)
     
-    return jsonify({
-        "success": True,
-        "job_id": job.job_id,
-        "status": job.status.value,
-        "metrics": metrics,
-        "summary": summary,
-        "artifacts": list(job.artifacts.keys())
-    })
+    response.set_etag(etag)
+    response.vary.add('Accept')
+    return response
 
 
 @app.route('/api/jobs/<job_id>/artifacts/<filename>', methods=['GET'])
@@ -166,14 +281,12 @@ def get_artifact(job_id: str, filename: str):
         }), 404
     
     # Determine content type
-    if filename.endswith('.png'):
-        mimetype = 'image/png'
-    elif filename.endswith('.json'):
-        mimetype = 'application/json'
-    else:
-        mimetype = 'application/octet-stream'
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
     
-    return send_file(file_path, mimetype=mimetype)
+    # Conditional responses let polling clients revalidate (ETag /
+    # If-Modified-Since) and fetch byte ranges without re-downloading
+    return send_file(file_path, mimetype=mimetype, conditional=True, etag=True,
+                     last_modified=os.path.getmtime(file_path))
 
 
 @app.route('/api/jobs', methods=['GET'])
@@ -197,7 +310,6 @@ def list_jobs():
 @app.route('/')
 def index():
     """Serve the main web UI."""
-    from flask import render_template
     return render_template('index.html')
 
 
@@ -216,11 +328,15 @@ def run_server(host: str = '0.0.0.0', port: int = 5000, debug: bool = False):
     print(f"[Server] Starting API server on http://{host}:{port}")
     print(f"[Server] Runs directory: {RUNS_DIR}")
     
+    # Keep a readable job.json next to each job while debugging
+    job_queue.debug = debug
+    
     # Start worker
     worker.start()
     
-    # Run Flask
-    app.run(host=host, port=port, debug=debug, use_reloader=False)
+    # Run Flask; handle each request in its own thread so slow clients and
+    # disk reads do not block other pollers
+    app.run(host=host, port=port, debug=debug, use_reloader=False, threaded=True)
 
 
 if __name__ == '__main__':
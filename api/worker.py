@@ -6,9 +6,12 @@ Processes simulation jobs from the queue.
 
 import sys
 import os
+import multiprocessing as mp
 import time
 import threading
-from typing import Optional
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,16 +24,62 @@ from simulation.engine import run_simulation
 from simulation.output_generator import generate_outputs
 
 
+class JobExecutionError(Exception):
+    """A job failed in a pool process; the message carries its traceback."""
+
+
+def _execute_job(job_id: str, input_params: Dict[str, Any],
+                 output_dir: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run one simulation and write its artifacts.
+    
+    Executed in a pool process: simulations are CPU-bound and seed the
+    global random module, so they cannot share an interpreter.
+    
+    Returns:
+        Tuple of (simulation result, artifacts). Artifacts are empty when
+        the simulation rejected its configuration.
+    
+    Raises:
+        JobExecutionError: The job raised; the traceback is formatted here,
+            since it does not survive the trip back from the pool process.
+    """
+    try:
+        # Load config from input params, using the job ID as run ID
+        config = load_config_from_json({**input_params, "run_id": job_id})
+        
+        # Run simulation
+        result = run_simulation(config)
+        if not result["success"]:
+            return result, {}
+        
+        # Generate output artifacts
+        artifacts = generate_outputs(result, output_dir)
+        return result, artifacts
+    except Exception as e:
+        raise JobExecutionError(f"{str(e)}\n{traceback.format_exc()}") from None
+
+
 class SimulationWorker:
     """
     Background worker that processes simulation jobs.
+    
+    A dispatcher thread claims pending jobs and runs up to n_workers of them
+    at once in a process pool. Jobs are claimed in batches of up to
+    claim_batch per scan of the pending index.
     """
     
-    def __init__(self, job_queue: JobQueue, poll_interval: float = 2.0):
+    def __init__(self, job_queue: JobQueue, poll_interval: float = 2.0,
+                 n_workers: Optional[int] = None, claim_batch: int = 16):
         self.job_queue = job_queue
         self.poll_interval = poll_interval
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.claim_batch = claim_batch
         self.running = False
         self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # One slot per pool process; taken before claiming a job
+        self._slots = threading.Semaphore(self.n_workers)
     
     def start(self):
         """Start the worker in a background thread."""
@@ -38,62 +87,121 @@ class SimulationWorker:
             return
         
         self.running = True
+        # Spawned, not forked: the server is multithreaded, and a forked child
+        # could inherit locks (stdout, queue/cache locks) held by other threads
+        self._executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                             mp_context=mp.get_context("spawn"))
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
-        print(f"[Worker] Started background worker (poll interval: {self.poll_interval}s)")
+        print(f"[Worker] Started background worker ({self.n_workers} processes, "
+              f"poll interval: {self.poll_interval}s)")
     
     def stop(self):
         """Stop the worker."""
         self.running = False
+        # Wake the loop if it is blocked waiting for new jobs
+        self.job_queue.wake_waiters()
         if self._thread:
             self._thread.join(timeout=5.0)
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         print("[Worker] Stopped")
     
     def _run_loop(self):
-        """Main worker loop."""
+        """Dispatcher loop: claim pending jobs and hand them to the pool."""
         while self.running:
+            # Wait for a free process before looking for work, then take
+            # every other idle slot (up to claim_batch) without blocking
+            if not self._slots.acquire(timeout=self.poll_interval):
+                continue
+            slots = 1
+            while slots < self.claim_batch and self._slots.acquire(blocking=False):
+                slots += 1
+            
+            # Snapshot before scanning, so a job submitted after the scan
+            # still ends the wait below immediately
+            wakeups = self.job_queue.wakeup_count()
             try:
-                job = self.job_queue.get_next_pending_job()
-                if job:
-                    self._process_job(job)
-                else:
-                    time.sleep(self.poll_interval)
+                jobs = self.job_queue.claim_pending_jobs(slots)
             except Exception as e:
+                self._slots.release(slots)
                 print(f"[Worker] Error in run loop: {e}")
                 time.sleep(self.poll_interval)
+                continue
+            
+            # Each submitted job releases its own slot when it finishes
+            for job in jobs:
+                self._submit(job)
+            if slots > len(jobs):
+                self._slots.release(slots - len(jobs))
+            
+            if not jobs:
+                # Sleep until a job is submitted in this process; the timeout
+                # still picks up jobs submitted by other processes.
+                self.job_queue.wait_for_job(wakeups, timeout=self.poll_interval)
+    
+    def _submit(self, job: SimulationJob):
+        """Submit a claimed (running) job to the pool."""
+        print(f"[Worker] Processing job {job.job_id}")
+        output_dir = self.job_queue.get_job_output_dir(job.job_id)
+        try:
+            future = self._executor.submit(_execute_job, job.job_id,
+                                           job.input_params, output_dir)
+        except Exception as e:
+            self._slots.release()
+            self.job_queue.fail_job(job.job_id, f"Could not schedule job: {e}")
+            return
+        future.add_done_callback(lambda f, job_id=job.job_id: self._on_job_done(job_id, f))
+    
+    def _on_job_done(self, job_id: str, future: Future):
+        """Record the outcome of a pooled job and free its slot."""
+        try:
+            if future.cancelled():
+                self.job_queue.fail_job(job_id, "Cancelled: worker stopped")
+                return
+            
+            error = future.exception()
+            if error is not None:
+                print(f"[Worker] Job {job_id} failed: {error}")
+                self.job_queue.fail_job(job_id, str(error))
+                return
+            
+            self._record_result(job_id, *future.result())
+        finally:
+            self._slots.release()
+    
+    def _record_result(self, job_id: str, result: Dict[str, Any],
+                       artifacts: Dict[str, str]):
+        """Mark a finished job as completed or failed."""
+        if not result["success"]:
+            self.job_queue.fail_job(job_id, str(result.get("errors", "Unknown error")))
+            return
+        
+        self.job_queue.complete_job(job_id, result, artifacts)
+        print(f"[Worker] Completed job {job_id}")
     
     def _process_job(self, job: SimulationJob):
-        """Process a single job."""
+        """Process a single job in the calling thread."""
         print(f"[Worker] Processing job {job.job_id}")
+        job_id = job.job_id
         
         # Mark as running
-        job = self.job_queue.start_job(job.job_id)
+        job = self.job_queue.start_job(job_id)
         if not job:
-            print(f"[Worker] Failed to start job {job.job_id}")
+            print(f"[Worker] Failed to start job {job_id}")
             return
         
         try:
-            # Load config from input params
-            config = load_config_from_json(job.input_params)
-            config.run_id = job.job_id  # Use job ID as run ID
-            
-            # Run simulation
-            result = run_simulation(config)
-            
-            if not result["success"]:
-                self.job_queue.fail_job(job.job_id, str(result.get("errors", "Unknown error")))
-                return
-            
-            # Generate output artifacts
             output_dir = self.job_queue.get_job_output_dir(job.job_id)
-            artifacts = generate_outputs(result, output_dir)
-            
-            # Mark as completed
-            self.job_queue.complete_job(job.job_id, result, artifacts)
-            print(f"[Worker] Completed job {job.job_id}")
+            result, artifacts = _execute_job(job.job_id, job.input_params, output_dir)
+            self._record_result(job.job_id, result, artifacts)
             
+        except JobExecutionError as e:
+            error_msg = str(e)
+            print(f"[Worker] Job {job.job_id} failed: {error_msg}")
+            self.job_queue.fail_job(job.job_id, error_msg)
         except Exception as e:
-            import traceback
             error_msg = f"{str(e)}\n{traceback.format_exc()}"
             print(f"[Worker] Job {job.job_id} failed: {error_msg}")
             self.job_queue.fail_job(job.job_id, error_msg)
@@ -108,10 +216,11 @@ class SimulationWorker:
         return True
 
 
-def run_worker_standalone(runs_dir: str = "runs"):
+def run_worker_standalone(runs_dir: str = "runs", poll_interval: float = 2.0,
+                          n_workers: Optional[int] = None):
     """Run worker as standalone process."""
     job_queue = JobQueue(runs_dir)
-    worker = SimulationWorker(job_queue)
+    worker = SimulationWorker(job_queue, poll_interval, n_workers)
     
     print("[Worker] Starting standalone worker...")
     print(f"[Worker] Monitoring directory: {os.path.abspath(runs_dir)}")
@@ -134,6 +243,8 @@ if __name__ == "__main__":
                         help="Directory for job runs")
     parser.add_argument("--poll-interval", type=float, default=2.0,
                         help="Polling interval in seconds")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of simulation processes (default: CPU count)")
     
     args = parser.parse_args()
-    run_worker_standalone(args.runs_dir)
+    run_worker_standalone(args.runs_dir, args.poll_interval, args.workers)
@@ -0,0 +1,40 @@
+#!/usr/bin/env bash
+# Build both PDF reports under PyPy.
+#
+# The report generators are pure Python on top of reportlab, so they run
+# unchanged on PyPy and benefit from its JIT. One interpreter builds the
+# reports ITERATIONS times, so later builds run on warm, JIT-compiled code.
+#
+# Setup (once):
+#   pypy3 -m pip install -r requirements-pypy.txt
+#
+# Usage:
+#   scripts/run_pypy.sh [ITERATIONS]
+#   PYPY=/opt/pypy3.10/bin/pypy3 scripts/run_pypy.sh 5
+
+set -euo pipefail
+
+PYPY="${PYPY:-pypy3}"
+ITERATIONS="${1:-1}"
+# Skip the built-PDF cache so every iteration really builds
+export REPORT_PDF_CACHE="${REPORT_PDF_CACHE:-0}"
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+
+mkdir -p "$ROOT/output"
+cd "$ROOT/src"
+
+"$PYPY" - "$ITERATIONS" "$ROOT/output" <<'PY'
+import os
+import sys
+import time
+
+from generate_report import create_report
+from generate_network_report import create_network_report
+
+iterations, output_dir = int(sys.argv[1]), sys.argv[2]
+for i in range(iterations):
+    start = time.perf_counter()
+    create_report(os.path.join(output_dir, "simulation_report.pdf"))
+    create_network_report(os.path.join(output_dir, "ns3_wireless_report.pdf"))
+    print(f"[PyPy] Iteration {i + 1}/{iterations}: {time.perf_counter() - start:.2f}s")
+PY
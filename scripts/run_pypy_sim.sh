@@ -0,0 +1,40 @@
+#!/usr/bin/env bash
+# Run the discrete-event simulation (src/main.py's run_one) under PyPy.
+#
+# The SimPy event loop and the per-packet model code are plain Python, so
+# the tracing JIT compiles them; NumPy (which has PyPy wheels) is only
+# called for block draws and the one-off topology/sensor-range passes.
+# One interpreter runs the seed-42 default config ITERATIONS times, so
+# later runs execute JIT-compiled code. Plots are skipped.
+#
+# Setup (once):
+#   pypy3 -m pip install -r requirements-pypy.txt
+#
+# Usage:
+#   scripts/run_pypy_sim.sh [ITERATIONS]
+#   PYPY=/opt/pypy3.10/bin/pypy3 scripts/run_pypy_sim.sh 5
+
+set -euo pipefail
+
+PYPY="${PYPY:-pypy3}"
+ITERATIONS="${1:-3}"
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+
+cd "$ROOT/src"
+
+"$PYPY" - "$ITERATIONS" <<'PY'
+import sys
+import time
+
+import config
+from main import run_one
+
+iterations = int(sys.argv[1])
+overrides = {"seed": config.RANDOM_SEED, "nodes": 16, "loss": config.LOSS_BASE,
+             "timeout": config.P2P_VERIFICATION_TIMEOUT, "gateway_down": False}
+for i in range(iterations):
+    start = time.perf_counter()
+    result = run_one(dict(overrides), verbose=False)
+    print(f"[PyPy] Run {i + 1}/{iterations}: {time.perf_counter() - start:.2f}s "
+          f"(DR {result['detection_rate']:.2%}, FPR {result['false_positive_rate']:.2%})")
+PY
@@ -5,18 +5,36 @@ Loads simulation parameters from JSON input with validation and defaults.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
-import json
-import uuid
+from functools import cached_property
+from typing import Optional, Dict, Any, Mapping
+from types import MappingProxyType
+import secrets
+import time
 from datetime import datetime
 
+import msgspec
 
-@dataclass
+
+def new_id() -> str:
+    """
+    Generate a unique, time-sortable ID.
+    
+    48-bit millisecond timestamp followed by 80 random bits, as 32 hex chars,
+    so IDs created later sort after earlier ones.
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{secrets.token_hex(10)}"
+
+
+@dataclass(frozen=True)
 class SimulationConfig:
-    """Complete configuration for a simulation run."""
+    """
+    Complete configuration for a simulation run.
+    
+    Frozen: use dataclasses.replace() to derive a modified config.
+    """
     
     # Run metadata
-    run_id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+    run_id: str = field(default_factory=new_id)
     random_seed: int = 42
     
     # Simulation scope
@@ -60,8 +78,28 @@ class SimulationConfig:
     gateway_up_duration_mean: float = 1800.0
     gateway_down_duration_mean: float = 300.0
     
+    @cached_property
+    def p2p_range_sq(self) -> float:
+        """Squared P2P range, for sqrt-free distance checks."""
+        return self.p2p_range * self.p2p_range
+    
+    @cached_property
+    def sensor_range_sq(self) -> float:
+        """Squared sensor range, for sqrt-free distance checks."""
+        return self.sensor_range * self.sensor_range
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert config to dictionary for serialization."""
+        """Convert config to a fresh dictionary for serialization."""
+        return {k: dict(v) if isinstance(v, Mapping) else v
+                for k, v in self.as_dict.items()}
+    
+    @cached_property
+    def as_dict(self) -> Mapping[str, Any]:
+        """Read-only nested form of the config, cached on the instance."""
+        return MappingProxyType({k: MappingProxyType(v) if isinstance(v, dict) else v
+                                 for k, v in self._sections().items()})
+    
+    def _sections(self) -> Dict[str, Any]:
         return {
             "run_id": self.run_id,
             "random_seed": self.random_seed,
@@ -104,6 +142,87 @@ class SimulationConfig:
         }
 
 
+# ============================================================================
+# Input schema
+# ============================================================================
+# The JSON input groups parameters into sections. Each section is a msgspec
+# Struct whose defaults come from SimulationConfig, so msgspec.convert does
+# the lookup, type coercion and defaulting for every field in one call.
+
+_D = SimulationConfig
+
+
+class SimulationSection(msgspec.Struct):
+    event_count: int = _D.event_count
+    intruder_probability: float = _D.intruder_probability
+    event_interval_mean: float = _D.event_interval_mean
+
+
+class TopologySection(msgspec.Struct):
+    outer_ring_nodes: int = _D.outer_ring_nodes
+    inner_ring_nodes: int = _D.inner_ring_nodes
+    outer_ring_radius: float = _D.outer_ring_radius
+    inner_ring_radius: float = _D.inner_ring_radius
+    inner_ring_offset_deg: float = _D.inner_ring_offset_deg
+    sensor_range: float = _D.sensor_range
+    p2p_range: float = _D.p2p_range
+
+
+class DecisionLogicSection(msgspec.Struct):
+    confirm_threshold: float = _D.confirm_threshold
+    verify_threshold: float = _D.verify_threshold
+    verification_timeout: float = _D.verification_timeout
+
+
+class ImageModelSection(msgspec.Struct):
+    boar_confidence_mean: float = _D.boar_confidence_mean
+    boar_confidence_std: float = _D.boar_confidence_std
+    noise_confidence_mean: float = _D.noise_confidence_mean
+    noise_confidence_std: float = _D.noise_confidence_std
+
+
+class CommunicationSection(msgspec.Struct):
+    loss_base: float = _D.loss_base
+    loss_per_meter: float = _D.loss_per_meter
+    delay_base: float = _D.delay_base
+    delay_per_meter: float = _D.delay_per_meter
+    delay_jitter: float = _D.delay_jitter
+
+
+class GatewaySection(msgspec.Struct):
+    up_duration_mean: float = _D.gateway_up_duration_mean
+    down_duration_mean: float = _D.gateway_down_duration_mean
+
+
+class SimulationConfigInput(msgspec.Struct):
+    """JSON input document (unknown keys are ignored)."""
+    run_id: Optional[str] = None
+    random_seed: int = _D.random_seed
+    simulation: SimulationSection = msgspec.field(default_factory=SimulationSection)
+    topology: TopologySection = msgspec.field(default_factory=TopologySection)
+    decision_logic: DecisionLogicSection = msgspec.field(default_factory=DecisionLogicSection)
+    image_model: ImageModelSection = msgspec.field(default_factory=ImageModelSection)
+    communication: CommunicationSection = msgspec.field(default_factory=CommunicationSection)
+    gateway: GatewaySection = msgspec.field(default_factory=GatewaySection)
+
+
+def _config_from_input(doc: SimulationConfigInput) -> SimulationConfig:
+    """Flatten a parsed input document into a SimulationConfig."""
+    params = {"random_seed": doc.random_seed}
+    if doc.run_id is not None:
+        params["run_id"] = doc.run_id
+    
+    for section in (doc.simulation, doc.topology, doc.decision_logic,
+                    doc.image_model, doc.communication):
+        params.update(msgspec.structs.asdict(section))
+    
+    # Gateway keys are prefixed in the flat config
+    for name, value in msgspec.structs.asdict(doc.gateway).items():
+        params[f"gateway_{name}"] = value
+    
+    return SimulationConfig(**params)
+
+
 def load_config_from_json(json_data: Dict[str, Any]) -> SimulationConfig:
     """
     Parse JSON input into a SimulationConfig with validation.
@@ -113,89 +232,19 @@ def load_config_from_json(json_data: Dict[str, Any]) -> SimulationConfig:
         
     Returns:
         SimulationConfig with values from JSON or defaults
+        
+    Raises:
+        msgspec.ValidationError: If a value cannot be coerced to its type
     """
-    config = SimulationConfig()
-    
-    # Set run_id if provided, otherwise generate
-    if "run_id" in json_data:
-        config.run_id = json_data["run_id"]
-    
-    if "random_seed" in json_data:
-        config.random_seed = int(json_data["random_seed"])
-    
-    # Simulation section
-    sim = json_data.get("simulation", {})
-    if "event_count" in sim:
-        config.event_count = int(sim["event_count"])
-    if "intruder_probability" in sim:
-        config.intruder_probability = float(sim["intruder_probability"])
-    if "event_interval_mean" in sim:
-        config.event_interval_mean = float(sim["event_interval_mean"])
-    
-    # Topology section
-    topo = json_data.get("topology", {})
-    if "outer_ring_nodes" in topo:
-        config.outer_ring_nodes = int(topo["outer_ring_nodes"])
-    if "inner_ring_nodes" in topo:
-        config.inner_ring_nodes = int(topo["inner_ring_nodes"])
-    if "outer_ring_radius" in topo:
-        config.outer_ring_radius = float(topo["outer_ring_radius"])
-    if "inner_ring_radius" in topo:
-        config.inner_ring_radius = float(topo["inner_ring_radius"])
-    if "inner_ring_offset_deg" in topo:
-        config.inner_ring_offset_deg = float(topo["inner_ring_offset_deg"])
-    if "sensor_range" in topo:
-        config.sensor_range = float(topo["sensor_range"])
-    if "p2p_range" in topo:
-        config.p2p_range = float(topo["p2p_range"])
-    
-    # Decision logic section
-    decision = json_data.get("decision_logic", {})
-    if "confirm_threshold" in decision:
-        config.confirm_threshold = float(decision["confirm_threshold"])
-    if "verify_threshold" in decision:
-        config.verify_threshold = float(decision["verify_threshold"])
-    if "verification_timeout" in decision:
-        config.verification_timeout = float(decision["verification_timeout"])
-    
-    # Image model section
-    img = json_data.get("image_model", {})
-    if "boar_confidence_mean" in img:
-        config.boar_confidence_mean = float(img["boar_confidence_mean"])
-    if "boar_confidence_std" in img:
-        config.boar_confidence_std = float(img["boar_confidence_std"])
-    if "noise_confidence_mean" in img:
-        config.noise_confidence_mean = float(img["noise_confidence_mean"])
-    if "noise_confidence_std" in img:
-        config.noise_confidence_std = float(img["noise_confidence_std"])
-    
-    # Communication section
-    comm = json_data.get("communication", {})
-    if "loss_base" in comm:
-        config.loss_base = float(comm["loss_base"])
-    if "loss_per_meter" in comm:
-        config.loss_per_meter = float(comm["loss_per_meter"])
-    if "delay_base" in comm:
-        config.delay_base = float(comm["delay_base"])
-    if "delay_per_meter" in comm:
-        config.delay_per_meter = float(comm["delay_per_meter"])
-    if "delay_jitter" in comm:
-        config.delay_jitter = float(comm["delay_jitter"])
-    
-    # Gateway section
-    gw = json_data.get("gateway", {})
-    if "up_duration_mean" in gw:
-        config.gateway_up_duration_mean = float(gw["up_duration_mean"])
-    if "down_duration_mean" in gw:
-        config.gateway_down_duration_mean = float(gw["down_duration_mean"])
-    
-    return config
+    doc = msgspec.convert(json_data, SimulationConfigInput, strict=False)
+    return _config_from_input(doc)
 
 
 def load_config_from_file(filepath: str) -> SimulationConfig:
     """Load configuration from a JSON file."""
-    with open(filepath, 'r') as f:
-        return load_config_from_json(json.load(f))
+    with open(filepath, 'rb') as f:
+        doc = msgspec.json.decode(f.read(), type=SimulationConfigInput, strict=False)
+    return _config_from_input(doc)
 
 
 def validate_config(config: SimulationConfig) -> list:
@@ -7,56 +7,79 @@ Headless SimPy simulation runner with JSON input/output.
 import simpy
 import random
 import math
+from array import array
 import os
-from typing import Dict, Any, Tuple, List
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import Dict, Any, Tuple, List, Optional
+from dataclasses import replace
 from datetime import datetime
 
-from .config_loader import SimulationConfig, validate_config
+from .config_loader import SimulationConfig, new_id, validate_config
 from .models import (
     Gateway, Network, Node, SimulationEnvironment,
     ImageConfidenceGenerator, EventType, DetectionRecord, SensorEvent
 )
 
 
+def _ring_points(count: int, radius: float, offset_deg: float = 0.0) -> np.ndarray:
+    """(count, 2) positions evenly spaced on a circle."""
+    angles = np.radians(np.arange(count) * (360.0 / count) + offset_deg)
+    return np.stack([radius * np.cos(angles), radius * np.sin(angles)], axis=1)
+
+
+def compute_node_layout(config: SimulationConfig) -> Tuple[List[str], np.ndarray, List[str]]:
+    """
+    Compute node IDs, positions and ring types, outer ring first.
+    
+    Returns:
+        Tuple of (node IDs, (N, 2) float64 position array, ring types)
+    """
+    n_outer = config.outer_ring_nodes
+    n_inner = config.inner_ring_nodes
+    
+    ids = [f"outer_{i}" for i in range(n_outer)] + [f"inner_{i}" for i in range(n_inner)]
+    points = np.concatenate([
+        _ring_points(n_outer, config.outer_ring_radius),
+        _ring_points(n_inner, config.inner_ring_radius, config.inner_ring_offset_deg),
+    ])
+    rings = ["outer"] * n_outer + ["inner"] * n_inner
+    return ids, points, rings
+
+
 def compute_node_positions(config: SimulationConfig) -> Dict[str, Tuple[float, float, str]]:
     """Compute (x, y) positions for all nodes."""
-    positions = {}
-    
-    # Outer ring
-    for i in range(config.outer_ring_nodes):
-        angle_deg = i * (360.0 / config.outer_ring_nodes)
-        angle_rad = math.radians(angle_deg)
-        x = config.outer_ring_radius * math.cos(angle_rad)
-        y = config.outer_ring_radius * math.sin(angle_rad)
-        positions[f"outer_{i}"] = (x, y, "outer")
-    
-    # Inner ring
-    for i in range(config.inner_ring_nodes):
-        angle_deg = i * (360.0 / config.inner_ring_nodes) + config.inner_ring_offset_deg
-        angle_rad = math.radians(angle_deg)
-        x = config.inner_ring_radius * math.cos(angle_rad)
-        y = config.inner_ring_radius * math.sin(angle_rad)
-        positions[f"inner_{i}"] = (x, y, "inner")
-    
-    return positions
+    ids, points, rings = compute_node_layout(config)
+    return {nid: (x, y, ring) for nid, (x, y), ring in zip(ids, points.tolist(), rings)}
+
+
+def neighbors_from_points(node_ids: List[str], points: np.ndarray,
+                          p2p_range: float) -> Dict[str, List[str]]:
+    """
+    Compute neighbors for each node from an (N, 2) position array.
+    
+    Pairwise squared distances are computed in one NumPy pass and compared
+    against the squared range, so no square roots are taken. Each neighbor
+    list is in node order.
+    """
+    diff = points[:, None, :] - points[None, :, :]
+    d2 = np.einsum('ijk,ijk->ij', diff, diff)
+    mask = d2 <= p2p_range * p2p_range
+    np.fill_diagonal(mask, False)
+    
+    neighbors = {nid: [] for nid in node_ids}
+    for row, col in zip(*np.nonzero(mask)):
+        neighbors[node_ids[row]].append(node_ids[col])
+    
+    return neighbors
 
 
 def compute_neighbors(positions: Dict[str, Tuple[float, float, str]], 
                       p2p_range: float) -> Dict[str, List[str]]:
     """Compute neighbors for each node based on P2P range."""
-    neighbors = {nid: [] for nid in positions}
     node_ids = list(positions.keys())
-    
-    for i, nid1 in enumerate(node_ids):
-        x1, y1, _ = positions[nid1]
-        for nid2 in node_ids[i + 1:]:
-            x2, y2, _ = positions[nid2]
-            dist = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-            if dist <= p2p_range:
-                neighbors[nid1].append(nid2)
-                neighbors[nid2].append(nid1)
-    
-    return neighbors
+    points = np.array([positions[nid][:2] for nid in node_ids], dtype=np.float64)
+    return neighbors_from_points(node_ids, points, p2p_range)
 
 
 def run_simulation(config: SimulationConfig) -> Dict[str, Any]:
@@ -94,11 +117,11 @@ def run_simulation(config: SimulationConfig) -> Dict[str, Any]:
     img_analyzer = ImageConfidenceGenerator(config)
     
     # Compute topology
-    positions = compute_node_positions(config)
-    neighbors = compute_neighbors(positions, config.p2p_range)
+    node_ids, points, rings = compute_node_layout(config)
+    neighbors = neighbors_from_points(node_ids, points, config.p2p_range)
     
     # Create nodes
-    for node_id, (x, y, ring_type) in positions.items():
+    for node_id, (x, y), ring_type in zip(node_ids, points.tolist(), rings):
         node = Node(
             env=env,
             node_id=node_id,
@@ -129,8 +152,7 @@ def run_simulation(config: SimulationConfig) -> Dict[str, Any]:
     # Compute metrics
     metrics = compute_metrics(sim_env.events, network.all_detections)
     
-    # Compute baseline for comparison
-    random.seed(config.random_seed)  # Reset seed for reproducible baseline
+    # Compute baseline for comparison (uses its own seeded generator)
     baseline = compute_baseline(sim_env.events, config)
     
     return {
@@ -141,60 +163,111 @@ def run_simulation(config: SimulationConfig) -> Dict[str, Any]:
         "metrics": metrics,
         "baseline": baseline,
         "topology": {
-            "total_nodes": len(positions),
+            "total_nodes": len(node_ids),
             "outer_nodes": config.outer_ring_nodes,
             "inner_nodes": config.inner_ring_nodes
         }
     }
 
 
+def run_simulations(configs: List[SimulationConfig],
+                    n_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run independent simulations in parallel worker processes.
+    
+    Args:
+        configs: Simulation configurations, one per run
+        n_workers: Number of worker processes (defaults to CPU count)
+        
+    Returns:
+        Result dictionaries in the same order as configs
+    """
+    if len(configs) <= 1:
+        return [run_simulation(config) for config in configs]
+    
+    n_workers = min(n_workers or os.cpu_count() or 1, len(configs))
+    executor = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        results = list(executor.map(run_simulation, configs))
+    except KeyboardInterrupt:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
+
+
 def compute_metrics(events: List[SensorEvent], 
                     detections: List[DetectionRecord]) -> Dict[str, Any]:
     """Compute all simulation metrics."""
-    import numpy as np
-    
     # Ground truth counts
     total_intruders = sum(1 for e in events if e.event_type == EventType.INTRUDER)
     total_noise = len(events) - total_intruders
 
-    # Unique event detection (first detection per event only)
-    detected_event_ids = set()
-    unique_detections = []
-    for d in sorted(detections, key=lambda x: x.detection_time):
-        if d.event_id not in detected_event_ids:
-            detected_event_ids.add(d.event_id)
-            unique_detections.append(d)
+    # Unique event detection (earliest detection per event only). Event IDs
+    # are dense from 0, so a list indexed by event_id replaces a hash map.
+    earliest: List[Optional[DetectionRecord]] = [None] * len(events)
+    for d in detections:
+        current = earliest[d.event_id]
+        if current is None or d.detection_time < current.detection_time:
+            earliest[d.event_id] = d
 
-    tp_unique = [d for d in unique_detections if d.is_true_positive]
-    fp_unique = [d for d in unique_detections if not d.is_true_positive]
+    # Single fused pass over the unique detections: every counter is updated
+    # in place and only latencies / used P2P counts are kept for the end.
+    n = 0
+    tp_count = 0
+    outage_count = 0
+    sum_lat = 0.0
+    max_lat = 0.0
+    total_p2p = 0
+    lat = array('d')
+    p2p_used = array('i')
+    for d in earliest:
+        if d is None:
+            continue
+        n += 1
+        latency = d.latency
+        lat.append(latency)
+        sum_lat += latency
+        if latency > max_lat:
+            max_lat = latency
+        if d.is_true_positive:
+            tp_count += 1
+        total_p2p += d.p2p_messages_sent
+        if d.used_p2p:
+            p2p_used.append(d.p2p_messages_sent)
+        if not d.gateway_was_up:
+            outage_count += 1
+    fp_count = n - tp_count
 
     # Metrics
-    fpr = len(fp_unique) / total_noise if total_noise > 0 else 0.0
-    detection_rate = len(tp_unique) / total_intruders if total_intruders > 0 else 0.0
+    fpr = fp_count / total_noise if total_noise > 0 else 0.0
+    detection_rate = tp_count / total_intruders if total_intruders > 0 else 0.0
 
     # Latency stats
-    latencies = [d.latency for d in unique_detections]
-    mean_latency = float(np.mean(latencies)) if latencies else 0.0
-    max_latency = float(np.max(latencies)) if latencies else 0.0
-    p95_latency = float(np.percentile(latencies, 95)) if latencies else 0.0
+    mean_latency = sum_lat / n if n else 0.0
+    max_latency = max_lat
+    # p95 by selection (O(n)) rather than a full sort: the sample at rank
+    # ceil(0.95 * (n - 1)), i.e. percentile with the "higher" method
+    if n:
+        k = math.ceil(0.95 * (n - 1))
+        p95_latency = float(np.partition(np.frombuffer(lat, dtype=np.float64), k)[k])
+    else:
+        p95_latency = 0.0
 
     # P2P message stats
-    p2p_messages_per_event = [d.p2p_messages_sent for d in unique_detections if d.used_p2p]
-    mean_p2p = float(np.mean(p2p_messages_per_event)) if p2p_messages_per_event else 0.0
-    total_p2p = sum(d.p2p_messages_sent for d in unique_detections)
+    mean_p2p = sum(p2p_used) / len(p2p_used) if p2p_used else 0.0
 
     # Gateway outage analysis
-    detections_during_outage = [d for d in unique_detections if not d.gateway_was_up]
-    outage_rate = len(detections_during_outage) / len(unique_detections) if unique_detections else 0.0
+    outage_rate = outage_count / n if n else 0.0
 
     return {
         "total_events": len(events),
         "total_intruders": total_intruders,
         "total_noise": total_noise,
         "total_detections": len(detections),
-        "unique_detections": len(unique_detections),
-        "true_positives": len(tp_unique),
-        "false_positives": len(fp_unique),
+        "unique_detections": n,
+        "true_positives": tp_count,
+        "false_positives": fp_count,
         "false_positive_rate": round(fpr, 4),
         "detection_rate": round(detection_rate, 4),
         "mean_latency_seconds": round(mean_latency, 4),
@@ -202,43 +275,40 @@ def compute_metrics(events: List[SensorEvent],
         "p95_latency_seconds": round(p95_latency, 4),
         "mean_p2p_messages": round(mean_p2p, 2),
         "total_p2p_messages": total_p2p,
-        "detections_during_outage": len(detections_during_outage),
+        "detections_during_outage": outage_count,
         "outage_detection_rate": round(outage_rate, 4),
-        "latencies": latencies,
-        "p2p_messages_list": p2p_messages_per_event
+        "latencies": lat.tolist(),
+        "p2p_messages_list": p2p_used.tolist()
     }
 
 
 def compute_baseline(events: List[SensorEvent], config: SimulationConfig) -> Dict[str, Any]:
     """
     Compute PIR-only baseline (naive system without AI thresholds).
+    
+    One confidence is drawn per event, all at once, from a generator seeded
+    with config.random_seed + 2, so the baseline does not replay the nodes'
+    own image confidences (seed) or the event stream (seed + 1).
     """
     NAIVE_THRESHOLD = 0.50
     
-    detections = []
-    for event in events:
-        is_intruder = event.event_type == EventType.INTRUDER
-        if is_intruder:
-            conf = random.gauss(config.boar_confidence_mean, config.boar_confidence_std)
-        else:
-            conf = random.gauss(config.noise_confidence_mean, config.noise_confidence_std)
-        conf = max(0.0, min(1.0, conf))
-        
-        if conf > NAIVE_THRESHOLD:
-            detections.append({
-                "event_id": event.event_id,
-                "is_true_positive": is_intruder
-            })
-
-    total_intruders = sum(1 for e in events if e.event_type == EventType.INTRUDER)
+    rng = np.random.default_rng(config.random_seed + 2)
+    is_intruder = np.fromiter((e.event_type is EventType.INTRUDER for e in events),
+                              bool, count=len(events))
+    total_intruders = int(is_intruder.sum())
     total_noise = len(events) - total_intruders
-    tp = sum(1 for d in detections if d["is_true_positive"])
-    fp = len(detections) - tp
+    
+    boar_conf = np.clip(rng.normal(config.boar_confidence_mean,
+                                   config.boar_confidence_std, size=total_intruders), 0.0, 1.0)
+    noise_conf = np.clip(rng.normal(config.noise_confidence_mean,
+                                    config.noise_confidence_std, size=total_noise), 0.0, 1.0)
+    tp = int((boar_conf > NAIVE_THRESHOLD).sum())
+    fp = int((noise_conf > NAIVE_THRESHOLD).sum())
 
     return {
         "detection_rate": round(tp / total_intruders, 4) if total_intruders > 0 else 0.0,
         "false_positive_rate": round(fp / total_noise, 4) if total_noise > 0 else 0.0,
-        "total_detections": len(detections)
+        "total_detections": tp + fp
     }
 
 
@@ -252,6 +322,12 @@ if __name__ == "__main__":
     parser.add_argument("--events", type=int, default=100, help="Number of events")
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--output", type=str, help="Output directory")
+    parser.add_argument("--runs", type=int, default=1,
+                        help="Number of runs (seeds start at --seed)")
+    parser.add_argument("--seeds", type=int, nargs="+",
+                        help="Explicit seeds, one run each (overrides --runs)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for multiple runs (default: CPU count)")
     
     args = parser.parse_args()
     
@@ -264,12 +340,27 @@ if __name__ == "__main__":
             random_seed=args.seed
         )
     
-    result = run_simulation(config)
+    if args.seeds:
+        seeds = args.seeds
+    else:
+        seeds = [config.random_seed + i for i in range(args.runs)]
     
-    if result["success"]:
-        print(f"Simulation completed: {result['run_id']}")
-        print(f"Detection Rate: {result['metrics']['detection_rate']:.2%}")
-        print(f"False Positive Rate: {result['metrics']['false_positive_rate']:.2%}")
-        print(f"Mean Latency: {result['metrics']['mean_latency_seconds']:.3f}s")
+    if len(seeds) == 1 and seeds[0] == config.random_seed:
+        configs = [config]
     else:
-        print(f"Simulation failed: {result['errors']}")
+        configs = [replace(config, random_seed=seed, run_id=new_id()) for seed in seeds]
+    
+    try:
+        results = run_simulations(configs, n_workers=args.workers)
+    except KeyboardInterrupt:
+        print("Interrupted")
+        raise SystemExit(130)
+    
+    for result in results:
+        if result["success"]:
+            print(f"Simulation completed: {result['run_id']}")
+            print(f"Detection Rate: {result['metrics']['detection_rate']:.2%}")
+            print(f"False Positive Rate: {result['metrics']['false_positive_rate']:.2%}")
+            print(f"Mean Latency: {result['metrics']['mean_latency_seconds']:.3f}s")
+        else:
+            print(f"Simulation failed: {result['errors']}")
@@ -8,6 +8,7 @@ All parameters passed via SimulationConfig - no global state.
 import simpy
 import random
 import math
+import numpy as np
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
@@ -20,7 +21,7 @@ class EventType(Enum):
     NOISE = "noise"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SensorEvent:
     """Represents an environmental event (intruder or noise)."""
     event_id: int
@@ -30,7 +31,7 @@ class SensorEvent:
     duration: float
 
 
-@dataclass
+@dataclass(slots=True)
 class DetectionRecord:
     """Record of a detection by the system."""
     event_id: int
@@ -45,7 +46,7 @@ class DetectionRecord:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageAnalysisResult:
     """Output from the abstracted Image Processing Module."""
     classification: str  # "wild_boar" or "other"
@@ -54,26 +55,78 @@ class ImageAnalysisResult:
 
 
 class ImageConfidenceGenerator:
-    """Abstracts the Image Processing / CNN module."""
+    """
+    Abstracts the Image Processing / CNN module.
+    
+    Confidence scores are drawn in blocks from a seeded NumPy generator and
+    handed out one at a time, instead of one random.gauss call per analysis.
+    """
+    
+    BUFFER_SIZE = 4096
+    
+    # Decision tiers, bucketed alongside each block of confidences
+    TIER_IGNORE = 0
+    TIER_VERIFY = 1
+    TIER_UPLINK = 2
     
     def __init__(self, config: SimulationConfig):
         self.boar_mean = config.boar_confidence_mean
         self.boar_std = config.boar_confidence_std
         self.noise_mean = config.noise_confidence_mean
         self.noise_std = config.noise_confidence_std
+        # Tier edges for np.digitize; verify is capped at confirm so the bins
+        # stay monotonic (anything >= confirm is an uplink either way)
+        self._tier_bins = np.array([
+            min(config.verify_threshold, config.confirm_threshold),
+            config.confirm_threshold,
+        ])
+        
+        self._rng = np.random.default_rng(config.random_seed)
+        self._boar_buf: List[float] = []
+        self._boar_tier: List[int] = []
+        self._boar_pos = 0
+        self._noise_buf: List[float] = []
+        self._noise_tier: List[int] = []
+        self._noise_pos = 0
+    
+    def _draw(self, mean: float, std: float) -> Tuple[List[float], List[int]]:
+        """Draw a block of confidences, clamped to [0.0, 1.0], and their tiers."""
+        samples = np.clip(self._rng.normal(mean, std, size=self.BUFFER_SIZE), 0.0, 1.0)
+        return samples.tolist(), np.digitize(samples, self._tier_bins).tolist()
+    
+    def sample_intruder(self) -> Tuple[float, int]:
+        """(confidence, tier) for an image of an intruder."""
+        if self._boar_pos == len(self._boar_buf):
+            self._boar_buf, self._boar_tier = self._draw(self.boar_mean, self.boar_std)
+            self._boar_pos = 0
+        i = self._boar_pos
+        self._boar_pos = i + 1
+        return self._boar_buf[i], self._boar_tier[i]
+    
+    def sample_noise(self) -> Tuple[float, int]:
+        """(confidence, tier) for an image of noise."""
+        if self._noise_pos == len(self._noise_buf):
+            self._noise_buf, self._noise_tier = self._draw(self.noise_mean, self.noise_std)
+            self._noise_pos = 0
+        i = self._noise_pos
+        self._noise_pos = i + 1
+        return self._noise_buf[i], self._noise_tier[i]
+    
+    def analyze_intruder(self) -> float:
+        """Confidence score for an image of an intruder (already clamped)."""
+        return self.sample_intruder()[0]
+    
+    def analyze_noise(self) -> float:
+        """Confidence score for an image of noise (already clamped)."""
+        return self.sample_noise()[0]
     
     def analyze(self, event_type: EventType) -> ImageAnalysisResult:
         """Generate a confidence score based on empirical distributions."""
-        if event_type == EventType.INTRUDER:
-            conf = random.gauss(self.boar_mean, self.boar_std)
-            cls = "wild_boar"
-        else:
-            conf = random.gauss(self.noise_mean, self.noise_std)
-            cls = "other"
-        
-        # Clamp to [0.0, 1.0]
-        conf = max(0.0, min(1.0, conf))
-        return ImageAnalysisResult(classification=cls, confidence=conf, timestamp=0.0)
+        if event_type is EventType.INTRUDER:
+            return ImageAnalysisResult(classification="wild_boar",
+                                       confidence=self.analyze_intruder(), timestamp=0.0)
+        return ImageAnalysisResult(classification="other",
+                                   confidence=self.analyze_noise(), timestamp=0.0)
 
 
 class Gateway:
@@ -83,7 +136,14 @@ class Gateway:
         self.env = env
         self.config = config
         self.is_up = True
-        self.uplinks_received: List[Dict[str, Any]] = []
+        # Uplink log as preallocated column buffers; most events reach at
+        # most a couple of nodes, so 2x event_count rarely needs to grow.
+        capacity = max(16, config.event_count * 2)
+        self._uplink_node = np.empty(capacity, dtype=object)
+        self._uplink_eid = np.empty(capacity, dtype=np.int32)
+        self._uplink_time = np.empty(capacity, dtype=np.float64)
+        self._uplink_delivered = np.empty(capacity, dtype=bool)
+        self._uplink_n = 0
         self.env.process(self._availability_process())
 
     def _availability_process(self):
@@ -98,21 +158,46 @@ class Gateway:
             yield self.env.timeout(down_duration)
             self.is_up = True
 
+    def _grow_uplinks(self):
+        """Double the capacity of the uplink buffers."""
+        n = self._uplink_n
+        for name in ("_uplink_node", "_uplink_eid", "_uplink_time", "_uplink_delivered"):
+            old = getattr(self, name)
+            new = np.empty(2 * len(old), dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
     def receive_uplink(self, node_id: str, event_id: int, time: float) -> bool:
         """Receive an uplink from a node (if gateway is up)."""
         delivered = self.is_up
-        self.uplinks_received.append({
-            "node_id": node_id,
-            "event_id": event_id,
-            "time": time,
-            "delivered": delivered
-        })
+        i = self._uplink_n
+        if i == len(self._uplink_eid):
+            self._grow_uplinks()
+        self._uplink_node[i] = node_id
+        self._uplink_eid[i] = event_id
+        self._uplink_time[i] = time
+        self._uplink_delivered[i] = delivered
+        self._uplink_n = i + 1
         return delivered
 
+    @property
+    def uplinks_received(self) -> List[Dict[str, Any]]:
+        """Uplink log as a list of dicts (built on demand)."""
+        n = self._uplink_n
+        return [
+            {"node_id": node_id, "event_id": event_id, "time": time, "delivered": delivered}
+            for node_id, event_id, time, delivered in zip(
+                self._uplink_node[:n].tolist(), self._uplink_eid[:n].tolist(),
+                self._uplink_time[:n].tolist(), self._uplink_delivered[:n].tolist())
+        ]
+
 
 class Network:
     """Wireless Networking Simulator (Abstracted - no RF physics)."""
 
+    # Events per batch in sensor_hits
+    SENSOR_HITS_CHUNK = 4096
+
     def __init__(self, env: simpy.Environment, gateway: Gateway, config: SimulationConfig):
         self.env = env
         self.gateway = gateway
@@ -122,19 +207,73 @@ class Network:
         
         # Simple collision tracking
         self.active_transmissions = 0
+        
+        # Topology in structure-of-arrays form, indexed by node position in
+        # node_list (insertion order). Neighbors are CSR: the links of node i
+        # are entries nbr_indptr[i]:nbr_indptr[i + 1] of nbr_idx and of the
+        # per-link arrays edge_loss / edge_delay.
+        self.node_list: List['Node'] = []
+        self.node_index: Dict[str, int] = {}
+        self.pos: Optional[np.ndarray] = None
+        self.nbr_indptr = np.zeros(1, dtype=np.int32)
+        self.nbr_idx = np.zeros(0, dtype=np.int32)
+        self.edge_loss = np.zeros(0, dtype=np.float64)
+        self.edge_delay = np.zeros(0, dtype=np.float64)
+        # Python-list views of the CSR arrays for the scalar broadcast loop
+        self._indptr: List[int] = [0]
+        self._edge_receivers: List['Node'] = []
+        self._edge_loss: List[float] = []
+        self._edge_delay: List[float] = []
 
     def add_node(self, node: 'Node'):
         self.nodes[node.node_id] = node
+        self.pos = None
+
+    def _build_positions(self):
+        """Freeze node order and pack positions into an (N, 2) array."""
+        self.node_list = list(self.nodes.values())
+        self.node_index = {node.node_id: i for i, node in enumerate(self.node_list)}
+        for i, node in enumerate(self.node_list):
+            node.index = i
+        self.pos = np.ascontiguousarray(
+            [node.position for node in self.node_list], dtype=np.float64
+        ).reshape(-1, 2)
 
     def set_neighbors(self, neighbors_map: Dict[str, List[str]]):
-        for node_id, neighbor_ids in neighbors_map.items():
-            if node_id in self.nodes:
-                self.nodes[node_id].neighbors = neighbor_ids
+        """
+        Set each node's neighbors and build the CSR link arrays.
+        
+        Topology does not change during a run, so each link's distance-based
+        loss probability and mean delay are computed once here.
+        """
+        self._build_positions()
+        cfg = self.config
+        
+        indptr = [0]
+        idx = []
+        for node in self.node_list:
+            neighbor_ids = neighbors_map.get(node.node_id, [])
+            node.neighbors = neighbor_ids
+            idx.extend(self.node_index[nid] for nid in neighbor_ids
+                       if nid in self.node_index)
+            indptr.append(len(idx))
+        
+        self.nbr_indptr = np.array(indptr, dtype=np.int32)
+        self.nbr_idx = np.array(idx, dtype=np.int32)
+        senders = np.repeat(np.arange(len(self.node_list)), np.diff(self.nbr_indptr))
+        delta = self.pos[senders] - self.pos[self.nbr_idx]
+        dist = np.sqrt((delta * delta).sum(axis=1))
+        self.edge_loss = cfg.loss_base + cfg.loss_per_meter * dist
+        self.edge_delay = cfg.delay_base + cfg.delay_per_meter * dist
+        
+        self._indptr = indptr
+        self._edge_receivers = [self.node_list[i] for i in idx]
+        self._edge_loss = self.edge_loss.tolist()
+        self._edge_delay = self.edge_delay.tolist()
 
     def p2p_broadcast(self, sender_id: str, message_type: str, payload: Any):
         """Simulate P2P multicast to neighbors with abstracted delays."""
-        sender = self.nodes[sender_id]
-        neighbors = sender.neighbors
+        sender = self.node_index[sender_id]
         
         # Determine message size for delay calculation
         if message_type == "VERIFY_REQ":
@@ -155,41 +294,52 @@ class Network:
         
         self.active_transmissions -= 1
 
-        for nid in neighbors:
-            if nid not in self.nodes:
-                continue
-            receiver = self.nodes[nid]
-            
-            # Distance calculation
-            sx, sy = sender.position
-            rx, ry = receiver.position
-            dist = math.sqrt((sx - rx)**2 + (sy - ry)**2)
-            
+        jitter = self.config.delay_jitter
+        for k in range(self._indptr[sender], self._indptr[sender + 1]):
             # Loss model (probability-based)
-            p_loss = self.config.loss_base + (self.config.loss_per_meter * dist) + collision_penalty
+            p_loss = self._edge_loss[k] + collision_penalty
             if random.random() < p_loss:
                 continue  # Packet lost
             
             # Delay model
-            delay = self.config.delay_base + (self.config.delay_per_meter * dist) + \
-                    random.uniform(-self.config.delay_jitter, self.config.delay_jitter)
+            delay = self._edge_delay[k] + random.uniform(-jitter, jitter)
             delay = max(0.01, delay)
             
-            # Schedule delivery
-            self.env.process(self._deliver_p2p(receiver, message_type, payload, delay))
-
-    def _deliver_p2p(self, receiver: 'Node', msg_type: str, payload: Any, delay: float):
-        yield self.env.timeout(delay)
-        receiver.receive_p2p_message(msg_type, payload)
-
-    def dispatch_event_to_nodes(self, event: SensorEvent):
-        """Dispatch event to nodes within sensor range."""
-        ex, ey = event.position
-        for node in self.nodes.values():
-            nx, ny = node.position
-            dist = math.sqrt((ex - nx) ** 2 + (ey - ny) ** 2)
-            if dist <= self.config.sensor_range:
-                node.handle_sensor_event(event)
+            # Schedule delivery: a bare timeout whose callback hands over the
+            # message (no process/generator per delivery)
+            delivery = simpy.events.Timeout(self.env, delay)
+            delivery.callbacks.append(
+                lambda _ev, r=self._edge_receivers[k]: r.receive_p2p_message(message_type, payload))
+
+    def sensor_hits(self, points: np.ndarray) -> List[List[int]]:
+        """
+        Node indices within sensor range of each point, in index order.
+        
+        Points are tested SENSOR_HITS_CHUNK at a time, so the temporary
+        distance arrays stay bounded however many events there are.
+        
+        Args:
+            points: (M, 2) array of event positions
+            
+        Returns:
+            One list of node indices per point
+        """
+        if self.pos is None:
+            self._build_positions()
+        
+        hits: List[List[int]] = []
+        for start in range(0, len(points), self.SENSOR_HITS_CHUNK):
+            chunk = points[start:start + self.SENSOR_HITS_CHUNK]
+            delta = chunk[:, None, :] - self.pos[None, :, :]
+            d2 = np.einsum('ijk,ijk->ij', delta, delta)
+            hits.extend(np.flatnonzero(row).tolist() for row in d2 <= self.config.sensor_range_sq)
+        return hits
+
+    def notify_nodes(self, event: SensorEvent, indices: List[int]):
+        """Hand an event to the nodes at the given indices."""
+        node_list = self.node_list
+        for i in indices:
+            node_list[i].handle_sensor_event(event)
 
     def report_detection(self, record: DetectionRecord):
         self.all_detections.append(record)
@@ -210,6 +360,8 @@ class Node:
         self.config = config
         self.img_analyzer = img_analyzer
         self.neighbors: List[str] = []
+        # Position in Network.node_list (assigned by the network)
+        self.index = -1
         
         # Verification state
         self.verification_event: Optional[simpy.Event] = None
@@ -221,16 +373,18 @@ class Node:
 
     def _process_logic(self, event: SensorEvent):
         # 1. Image Processing Abstraction
-        result = self.img_analyzer.analyze(event.event_type)
-        confidence = result.confidence
+        if event.event_type is EventType.INTRUDER:
+            confidence, tier = self.img_analyzer.sample_intruder()
+        else:
+            confidence, tier = self.img_analyzer.sample_noise()
         
-        # 2. Decision Policy
+        # 2. Decision Policy (tier bucketed against the thresholds at draw time)
         # Tier 1: High Confidence -> Immediate Uplink
-        if confidence >= self.config.confirm_threshold:
+        if tier == ImageConfidenceGenerator.TIER_UPLINK:
             self._send_uplink(event, confidence, used_p2p=False, p2p_msgs=0)
             
         # Tier 2: Medium Confidence -> P2P Verification
-        elif confidence >= self.config.verify_threshold:
+        elif tier == ImageConfidenceGenerator.TIER_VERIFY:
             yield from self._run_verification_protocol(event, confidence)
             
         # Tier 3: Low Confidence -> Ignore
@@ -242,14 +396,18 @@ class Node:
         # Broadcast VERIFY_REQ
         yield from self.network.p2p_broadcast(self.node_id, "VERIFY_REQ", event)
         
-        # Wait for responses
+        # Wait for responses. The timeout resolves the same event with False
+        # instead of racing it through an AnyOf condition.
         self.pending_confirmations = 0
-        self.verification_event = self.env.event()
+        verification = self.verification_event = self.env.event()
+        timeout = self.env.timeout(self.config.verification_timeout)
+        timeout.callbacks.append(
+            lambda _: verification.triggered or verification.succeed(False))
         
         try:
-            yield self.verification_event | self.env.timeout(self.config.verification_timeout)
+            confirmed = yield verification
             
-            if self.verification_event.triggered:
+            if confirmed:
                 # Confirmed! Escalate
                 self._send_uplink(event, confidence, used_p2p=True, p2p_msgs=1)
         except simpy.Interrupt:
@@ -260,8 +418,11 @@ class Node:
         if msg_type == "VERIFY_REQ":
             event = payload
             # Check my own camera/sensor
-            my_reading = self.img_analyzer.analyze(event.event_type)
-            if my_reading.confidence >= self.config.confirm_threshold:
+            if event.event_type is EventType.INTRUDER:
+                _, my_tier = self.img_analyzer.sample_intruder()
+            else:
+                _, my_tier = self.img_analyzer.sample_noise()
+            if my_tier == ImageConfidenceGenerator.TIER_UPLINK:
                 # Send VERIFY_RESP
                 self.env.process(
                     self.network.p2p_broadcast(self.node_id, "VERIFY_RESP", payload)
@@ -271,7 +432,7 @@ class Node:
             # Someone confirmed my request
             if self.verification_event and not self.verification_event.triggered:
                 self.pending_confirmations += 1
-                self.verification_event.succeed()
+                self.verification_event.succeed(True)
 
     def _send_uplink(self, event: SensorEvent, confidence: float, used_p2p: bool, p2p_msgs: int):
         """Send final confirmation to Gateway."""
@@ -312,26 +473,30 @@ class SimulationEnvironment:
         # Generate events within perimeter area (based on outer ring radius)
         max_radius = self.config.outer_ring_radius + 5  # Slightly beyond outer ring
         
-        for _ in range(count):
-            interval = random.expovariate(1.0 / self.config.event_interval_mean)
-            yield self.env.timeout(interval)
+        # Pre-sample every event attribute in one vectorized draw each
+        rng = np.random.default_rng(self.config.random_seed + 1)
+        intervals = rng.exponential(self.config.event_interval_mean, count).tolist()
+        is_intruder = (rng.random(count) < self.config.intruder_probability).tolist()
+        angles = rng.uniform(0, 2 * math.pi, count)
+        radii = rng.uniform(0, max_radius, count)
+        durations = rng.uniform(1, 5, count).tolist()
+        points = np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1)
+        # Sensor-range test for every event at once; the loop only indexes it
+        hits = self.network.sensor_hits(points)
+        positions = list(map(tuple, points.tolist()))
+        
+        for i in range(count):
+            yield self.env.timeout(intervals[i])
 
-            is_intruder = random.random() < self.config.intruder_probability
-            event_type = EventType.INTRUDER if is_intruder else EventType.NOISE
-            
-            # Random position within perimeter
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.uniform(0, max_radius)
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
+            event_type = EventType.INTRUDER if is_intruder[i] else EventType.NOISE
             
             event = SensorEvent(
                 event_id=self.event_counter,
                 event_type=event_type,
                 time=self.env.now,
-                position=(x, y),
-                duration=random.uniform(1, 5)
+                position=positions[i],
+                duration=durations[i]
             )
             self.events.append(event)
             self.event_counter += 1
-            self.network.dispatch_event_to_nodes(event)
+            self.network.notify_nodes(event, hits[i])
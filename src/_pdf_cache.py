@@ -0,0 +1,87 @@
+"""
+Cache of built PDF reports, keyed on a hash of their inputs.
+
+An unchanged report is copied from the cache instead of rebuilt. This module
+does not import reportlab, so a cache hit never pays its import cost.
+"""
+
+import hashlib
+import os
+import shutil
+
+# REPORT_PDF_CACHE=0 disables the built-PDF cache (e.g. for timing builds)
+_CACHE_ENABLED = os.environ.get("REPORT_PDF_CACHE", "1") != "0"
+
+# Config values whose repr is stable across processes; objects such as the
+# shared generator repr with their memory address and would change every key
+_PLAIN_TYPES = (bool, int, float, str, tuple, type(None))
+
+
+def report_cache_key(config, *parts, files=()) -> str:
+    """Hash of everything a report build depends on.
+    
+    Args:
+        config: Config module; its plain-valued UPPERCASE constants are hashed.
+        *parts: Extra values rendered into the report (e.g. the date).
+        files: Paths whose mtime and size are hashed (sources, plot PNGs);
+            missing files hash as missing.
+    
+    Returns:
+        Hex digest used as the cache file name.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    settings = {k: getattr(config, k) for k in dir(config) if k.isupper()}
+    h.update(repr({k: v for k, v in settings.items() if isinstance(v, _PLAIN_TYPES)}).encode())
+    h.update(repr(parts).encode())
+    for path in files:
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_mtime_ns}:{st.st_size}".encode())
+        except FileNotFoundError:
+            h.update(f"{path}:missing".encode())
+    return h.hexdigest()
+
+
+def _cache_path(key: str, output_path: str) -> str:
+    """Cache file for a build: named after the report, so its stale builds can be found."""
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(output_path)), "_pdfcache",
+                        f"{stem}-{key}.pdf")
+
+
+def restore_cached_pdf(key: str, output_path: str) -> bool:
+    """Copy a cached build to output_path. Returns False on a cache miss."""
+    if not _CACHE_ENABLED:
+        return False
+    cached = _cache_path(key, output_path)
+    if not os.path.exists(cached):
+        return False
+    shutil.copyfile(cached, output_path)
+    return True
+
+
+def store_cached_pdf(key: str, output_path: str):
+    """Keep a copy of a freshly built PDF under its cache key.
+    
+    Older cached builds of the same report are removed: a new key means
+    their inputs (or build date) are out of date.
+    """
+    if not _CACHE_ENABLED:
+        return
+    cached = _cache_path(key, output_path)
+    cache_dir = os.path.dirname(cached)
+    os.makedirs(cache_dir, exist_ok=True)
+    shutil.copyfile(output_path, cached)
+    
+    # Same report name, same-length key, different key
+    name = os.path.basename(cached)
+    prefix = name[:-len(key) - len(".pdf")]
+    with os.scandir(cache_dir) as entries:
+        stale = [entry.path for entry in entries
+                 if len(entry.name) == len(name) and entry.name != name
+                 and entry.name.startswith(prefix) and entry.name.endswith(".pdf")]
+    for path in stale:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,45 @@
+"""
+ReportLab imports and build helpers shared by the PDF report generators.
+
+The reportlab probe runs once here instead of in every generator module; the
+generators import this module lazily, only when a report is actually built.
+"""
+
+try:
+    from reportlab.lib import colors
+except ImportError as e:
+    raise ImportError(
+        "PDF report generation requires reportlab: pip install reportlab"
+    ) from e
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch, cm
+from reportlab.platypus import (
+    BaseDocTemplate, SimpleDocTemplate, PageTemplate, Frame,
+    Paragraph, Spacer, Table, TableStyle,
+    Image, PageBreak, ListFlowable, ListItem
+)
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+
+# Optional pikepdf pass that packs objects into compressed object streams
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+
+def compact_pdf(path: str):
+    """Rewrite a built PDF with object streams and recompressed content.
+    
+    No-op when pikepdf is not installed.
+    """
+    if pikepdf is None:
+        return
+    with pikepdf.open(path, allow_overwriting_input=True) as pdf:
+        pdf.save(
+            path,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            compress_streams=True,
+            stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+        )
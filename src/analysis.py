@@ -1,6 +1,7 @@
 # Dual-Ring LoRa Perimeter Simulation
 # Analysis: Metrics computation and plotting
 
+import functools
 import matplotlib.pyplot as plt
 import numpy as np
 from typing import List, Dict, Any
@@ -8,6 +9,48 @@ from collections import defaultdict
 
 from models import DetectionRecord, SensorEvent, EventType
 
+# Per-detection fields used by compute_metrics
+DETECTION_DTYPE = np.dtype([
+    ('t', 'f8'), ('lat', 'f8'), ('p2p', 'i4'), ('tp', '?'),
+    ('used', '?'), ('gw', '?'), ('eid', 'i8'),
+])
+
+
+def _first_detection_mask_np(eid, t):
+    """Mark the earliest row per event ID (first row among ties), in O(N)."""
+    n_events = int(eid.max()) + 1
+    best_t = np.full(n_events, np.inf)
+    np.minimum.at(best_t, eid, t)
+    at_best = np.flatnonzero(t == best_t[eid])
+    first = np.full(n_events, len(eid))
+    np.minimum.at(first, eid[at_best], at_best)
+    mask = np.zeros(len(eid), dtype=bool)
+    mask[first[first < len(eid)]] = True
+    return mask
+
+
+def _first_detection_mask_loop(eid, t):
+    """Single-pass version of _first_detection_mask_np, compiled with numba."""
+    n = eid.shape[0]
+    best = np.full(eid.max() + 1, -1, dtype=np.int64)
+    for i in range(n):
+        j = best[eid[i]]
+        if j < 0 or t[i] < t[j]:
+            best[eid[i]] = i
+    mask = np.zeros(n, dtype=np.bool_)
+    for j in best:
+        if j >= 0:
+            mask[j] = True
+    return mask
+
+
+# Optional numba acceleration for the dedup pass; NumPy fallback otherwise
+try:
+    from numba import njit
+    _first_detection_mask = njit(cache=True)(_first_detection_mask_loop)
+except ImportError:
+    _first_detection_mask = _first_detection_mask_np
+
 
 def compute_metrics(
     events: List[SensorEvent],
@@ -19,59 +62,58 @@ def compute_metrics(
     total_intruders = sum(1 for e in events if e.event_type == EventType.INTRUDER)
     total_noise = len(events) - total_intruders
 
-    # Detections analysis
-    true_positives = [d for d in detections if d.is_true_positive]
-    false_positives = [d for d in detections if not d.is_true_positive]
+    # Materialize detection fields once as a structured array
+    arr = np.fromiter(
+        ((d.detection_time, d.latency, d.p2p_messages_sent, d.is_true_positive,
+          d.used_p2p, d.gateway_was_up, d.event_id) for d in detections),
+        dtype=DETECTION_DTYPE, count=len(detections))
 
-    # Unique event detection (first detection per event only)
-    detected_event_ids = set()
-    unique_detections = []
-    for d in sorted(detections, key=lambda x: x.detection_time):
-        if d.event_id not in detected_event_ids:
-            detected_event_ids.add(d.event_id)
-            unique_detections.append(d)
+    # Unique event detection (first detection per event only). Rows stay in
+    # recorded order.
+    unique = arr[_first_detection_mask(arr['eid'], arr['t'])] if len(arr) else arr
+    n_unique = len(unique)
 
-    tp_unique = [d for d in unique_detections if d.is_true_positive]
-    fp_unique = [d for d in unique_detections if not d.is_true_positive]
+    tp_count = int(unique['tp'].sum())
+    fp_count = n_unique - tp_count
 
     # False Positive Rate = FP / (FP + TN) = FP / total_noise
-    fpr = len(fp_unique) / total_noise if total_noise > 0 else 0.0
+    fpr = fp_count / total_noise if total_noise > 0 else 0.0
 
     # Detection Rate (Sensitivity) = TP / total_intruders
-    detection_rate = len(tp_unique) / total_intruders if total_intruders > 0 else 0.0
+    detection_rate = tp_count / total_intruders if total_intruders > 0 else 0.0
 
     # Latency stats
-    latencies = [d.latency for d in unique_detections]
-    mean_latency = np.mean(latencies) if latencies else 0.0
-    max_latency = np.max(latencies) if latencies else 0.0
+    latencies = unique['lat']
+    mean_latency = latencies.mean() if n_unique else 0.0
+    max_latency = latencies.max() if n_unique else 0.0
 
     # P2P message stats
-    p2p_messages_per_event = [d.p2p_messages_sent for d in unique_detections if d.used_p2p]
-    mean_p2p = np.mean(p2p_messages_per_event) if p2p_messages_per_event else 0.0
-    total_p2p = sum(d.p2p_messages_sent for d in unique_detections)
+    p2p_messages_per_event = unique['p2p'][unique['used']]
+    mean_p2p = p2p_messages_per_event.mean() if p2p_messages_per_event.size else 0.0
+    total_p2p = int(unique['p2p'].sum())
 
     # Gateway outage analysis
-    detections_during_outage = [d for d in unique_detections if not d.gateway_was_up]
-    outage_rate = len(detections_during_outage) / len(unique_detections) if unique_detections else 0.0
+    detections_during_outage = int(n_unique - unique['gw'].sum())
+    outage_rate = detections_during_outage / n_unique if n_unique else 0.0
 
     return {
         "total_events": len(events),
         "total_intruders": total_intruders,
         "total_noise": total_noise,
         "total_detections": len(detections),
-        "unique_detections": len(unique_detections),
-        "true_positives": len(tp_unique),
-        "false_positives": len(fp_unique),
+        "unique_detections": n_unique,
+        "true_positives": tp_count,
+        "false_positives": fp_count,
         "false_positive_rate": fpr,
         "detection_rate": detection_rate,
         "mean_latency": mean_latency,
         "max_latency": max_latency,
         "mean_p2p_messages": mean_p2p,
         "total_p2p_messages": total_p2p,
-        "detections_during_outage": len(detections_during_outage),
+        "detections_during_outage": detections_during_outage,
         "outage_detection_rate": outage_rate,
-        "latencies": latencies,
-        "p2p_messages_list": p2p_messages_per_event
+        "latencies": latencies.tolist(),
+        "p2p_messages_list": p2p_messages_per_event.tolist()
     }
 
 
@@ -81,36 +123,41 @@ def compute_pir_only_baseline(events: List[SensorEvent]) -> Dict[str, Any]:
     Uses the Image Confidence model, but alerts if confidence > 0.5 (any trigger).
     This represents a system without smart AI filtering or cross-verification.
     """
-    import random
+    import config
+
+    is_intruder = np.fromiter((e.event_type == EventType.INTRUDER for e in events),
+                              dtype=bool, count=len(events))
+    # The result depends only on the seed and the intruder flags, so runs
+    # that differ in loss/timeout/gateway settings share one computation
+    return dict(_baseline_cached(config.RANDOM_SEED, is_intruder.tobytes()))
+
+
+@functools.lru_cache(maxsize=8)
+def _baseline_cached(seed: int, intruder_flags: bytes) -> Dict[str, Any]:
+    """PIR-only baseline for a seed and the events' packed intruder flags."""
     import config
 
     NAIVE_THRESHOLD = 0.50  # Naive system: alert on any moderate signal
     
-    detections = []
-    for event in events:
-        is_intruder = event.event_type == EventType.INTRUDER
-        # Use the same image confidence model
-        if is_intruder:
-            conf = random.gauss(config.IMG_BOAR_MEAN, config.IMG_BOAR_STD)
-        else:
-            conf = random.gauss(config.IMG_NON_BOAR_MEAN, config.IMG_NON_BOAR_STD)
-        conf = max(0.0, min(1.0, conf))
-        
-        if conf > NAIVE_THRESHOLD:
-            detections.append({
-                "event_id": event.event_id,
-                "is_true_positive": is_intruder
-            })
-
-    total_intruders = sum(1 for e in events if e.event_type == EventType.INTRUDER)
-    total_noise = len(events) - total_intruders
-    tp = sum(1 for d in detections if d["is_true_positive"])
-    fp = len(detections) - tp
+    # Use the same image confidence model, drawn for all events at once
+    rng = np.random.default_rng(seed)
+    is_intruder = np.frombuffer(intruder_flags, dtype=bool)
+    n = is_intruder.size
+    conf = np.where(is_intruder,
+                    rng.normal(config.IMG_BOAR_MEAN, config.IMG_BOAR_STD, n),
+                    rng.normal(config.IMG_NON_BOAR_MEAN, config.IMG_NON_BOAR_STD, n))
+    np.clip(conf, 0.0, 1.0, out=conf)
+    hits = conf > NAIVE_THRESHOLD
+
+    total_intruders = int(is_intruder.sum())
+    total_noise = n - total_intruders
+    tp = int((hits & is_intruder).sum())
+    fp = int((hits & ~is_intruder).sum())
 
     return {
         "detection_rate": tp / total_intruders if total_intruders > 0 else 0.0,
         "false_positive_rate": fp / total_noise if total_noise > 0 else 0.0,
-        "total_detections": len(detections)
+        "total_detections": tp + fp
     }
 
 
@@ -153,37 +200,59 @@ def print_summary(metrics: Dict[str, Any], baseline: Dict[str, Any]):
     print("=" * 60)
 
 
-def generate_plots(metrics: Dict[str, Any], output_dir: str = "."):
-    """Generate visualization plots."""
+# Plots are written as PNG and as SVG; the PDF report embeds the SVG as
+# vector graphics when svglib is installed
+PLOT_FORMATS = ("png", "svg")
+
+# Points drawn on the latency CDF; larger samples are reduced to quantiles
+CDF_MAX_POINTS = 200
+
+
+def _save_plot(output_dir: str, name: str):
+    """Save the current figure under output_dir in every PLOT_FORMATS format."""
     import os
-    os.makedirs(output_dir, exist_ok=True)
+    for fmt in PLOT_FORMATS:
+        plt.savefig(os.path.join(output_dir, f"{name}.{fmt}"), dpi=150)
 
-    # 1. Latency CDF
-    plt.figure(figsize=(8, 5))
-    latencies = sorted(metrics['latencies'])
-    if latencies:
-        cdf = np.arange(1, len(latencies) + 1) / len(latencies)
-        plt.plot(latencies, cdf, linewidth=2)
-        plt.xlabel("Latency (seconds)")
-        plt.ylabel("CDF")
-        plt.title("Detection Latency CDF")
-        plt.grid(True, alpha=0.3)
-        plt.savefig(os.path.join(output_dir, "latency_cdf.png"), dpi=150)
-        plt.close()
-
-    # 2. P2P Message Overhead Histogram
+
+def plot_latency(metrics: Dict[str, Any], output_dir: str):
+    """Detection latency CDF."""
+    latencies = np.sort(np.asarray(metrics['latencies'], dtype=np.float64))
+    if not latencies.size:
+        return
     plt.figure(figsize=(8, 5))
+    if latencies.size > CDF_MAX_POINTS:
+        # Fixed number of quantiles keeps the SVG path small for long runs
+        cdf = np.linspace(0.0, 1.0, CDF_MAX_POINTS)
+        latencies = np.quantile(latencies, cdf)
+    else:
+        cdf = np.arange(1, latencies.size + 1, dtype=np.float64) / latencies.size
+    plt.plot(latencies, cdf, linewidth=2)
+    plt.xlabel("Latency (seconds)")
+    plt.ylabel("CDF")
+    plt.title("Detection Latency CDF")
+    plt.grid(True, alpha=0.3)
+    _save_plot(output_dir, "latency_cdf")
+    plt.close()
+
+
+def plot_p2p(metrics: Dict[str, Any], output_dir: str):
+    """P2P message overhead histogram."""
     p2p_list = metrics['p2p_messages_list']
-    if p2p_list:
-        plt.hist(p2p_list, bins=range(0, max(p2p_list) + 2), edgecolor='black', alpha=0.7)
-        plt.xlabel("P2P Messages per Event")
-        plt.ylabel("Frequency")
-        plt.title("P2P Message Overhead per Event")
-        plt.grid(True, alpha=0.3)
-        plt.savefig(os.path.join(output_dir, "p2p_overhead.png"), dpi=150)
-        plt.close()
-
-    # 3. Detection Comparison Bar Chart
+    if not p2p_list:
+        return
+    plt.figure(figsize=(8, 5))
+    plt.hist(p2p_list, bins=range(0, max(p2p_list) + 2), edgecolor='black', alpha=0.7)
+    plt.xlabel("P2P Messages per Event")
+    plt.ylabel("Frequency")
+    plt.title("P2P Message Overhead per Event")
+    plt.grid(True, alpha=0.3)
+    _save_plot(output_dir, "p2p_overhead")
+    plt.close()
+
+
+def plot_comparison(metrics: Dict[str, Any], output_dir: str):
+    """Detection rate / false positive rate bar chart."""
     plt.figure(figsize=(8, 5))
     categories = ['Detection Rate', 'False Positive Rate']
     cascaded_values = [metrics['detection_rate'], metrics['false_positive_rate']]
@@ -197,7 +266,19 @@ def generate_plots(metrics: Dict[str, Any], output_dir: str = "."):
     plt.ylim(0, 1)
     plt.legend()
     plt.grid(True, alpha=0.3, axis='y')
-    plt.savefig(os.path.join(output_dir, "detection_comparison.png"), dpi=150)
+    _save_plot(output_dir, "detection_comparison")
     plt.close()
 
+
+PLOTTERS = (plot_latency, plot_p2p, plot_comparison)
+
+
+def generate_plots(metrics: Dict[str, Any], output_dir: str = "."):
+    """Generate visualization plots (one PLOTTERS entry per figure)."""
+    import os
+    os.makedirs(output_dir, exist_ok=True)
+
+    for plot in PLOTTERS:
+        plot(metrics, output_dir)
+
     print(f"Plots saved to {output_dir}/")
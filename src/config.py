@@ -1,10 +1,24 @@
 # Dual-Ring LoRa Perimeter Simulation
 # Configuration Parameters
 
-import math
+import functools
+
+import numpy as np
+
+from rng import BatchRNG
 
 # --- Random Seed for Determinism ---
 RANDOM_SEED = 42
+# Shared block-buffered PCG64 generator for all simulation draws;
+# reseed() restarts it
+RNG = BatchRNG(RANDOM_SEED)
+
+
+def reseed(seed):
+    """Set RANDOM_SEED and restart the shared generator from it."""
+    global RANDOM_SEED, RNG
+    RANDOM_SEED = seed
+    RNG = BatchRNG(seed)
 
 # --- Simulation Time ---
 SIM_DURATION = 10000  # simulation time units (seconds)
@@ -60,36 +74,53 @@ INTRUDER_EVENT_PROB = 0.30  # 30% of events are true intruders
 EVENT_INTERVAL_MEAN = 8.0  # mean time between events (seconds)
 
 
+def _ring_xy(count, radius, spacing_deg, offset_deg=0.0):
+    """(count, 2) array of positions on a ring."""
+    angles = np.radians(np.arange(count) * spacing_deg + offset_deg)
+    return radius * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+@functools.lru_cache(maxsize=4)
+def _node_positions(outer_nodes, inner_nodes, outer_radius, inner_radius,
+                    spacing_deg, offset_deg):
+    """Ring layout for the given topology constants, as a tuple of entries."""
+    outer_xy = _ring_xy(outer_nodes, outer_radius, spacing_deg)
+    inner_xy = _ring_xy(inner_nodes, inner_radius, spacing_deg, offset_deg)
+    positions = [(f"outer_{i}", (x, y, "outer")) for i, (x, y) in enumerate(outer_xy.tolist())]
+    positions += [(f"inner_{i}", (x, y, "inner")) for i, (x, y) in enumerate(inner_xy.tolist())]
+    return tuple(positions)
+
+
 def compute_node_positions():
-    """Compute (x, y) positions for all 16 nodes."""
-    positions = {}
-    # Outer ring
-    for i in range(OUTER_RING_NODES):
-        angle_deg = i * OUTER_RING_SPACING_DEG
-        angle_rad = math.radians(angle_deg)
-        x = OUTER_RING_RADIUS * math.cos(angle_rad)
-        y = OUTER_RING_RADIUS * math.sin(angle_rad)
-        positions[f"outer_{i}"] = (x, y, "outer")
-    # Inner ring
-    for i in range(INNER_RING_NODES):
-        angle_deg = i * OUTER_RING_SPACING_DEG + INNER_RING_OFFSET_DEG
-        angle_rad = math.radians(angle_deg)
-        x = INNER_RING_RADIUS * math.cos(angle_rad)
-        y = INNER_RING_RADIUS * math.sin(angle_rad)
-        positions[f"inner_{i}"] = (x, y, "inner")
-    return positions
-
-
-def compute_neighbors(positions):
-    """Compute neighbors for each node based on P2P_RANGE."""
-    neighbors = {nid: [] for nid in positions}
-    node_ids = list(positions.keys())
-    for i, nid1 in enumerate(node_ids):
-        x1, y1, _ = positions[nid1]
-        for nid2 in node_ids[i + 1:]:
-            x2, y2, _ = positions[nid2]
-            dist = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-            if dist <= P2P_RANGE:
-                neighbors[nid1].append(nid2)
-                neighbors[nid2].append(nid1)
-    return neighbors
+    """Compute (x, y) positions for all 16 nodes.
+    
+    Cached on the topology constants, so overriding them still takes effect.
+    """
+    return dict(_node_positions(OUTER_RING_NODES, INNER_RING_NODES,
+                                OUTER_RING_RADIUS, INNER_RING_RADIUS,
+                                OUTER_RING_SPACING_DEG, INNER_RING_OFFSET_DEG))
+
+
+@functools.lru_cache(maxsize=4)
+def _neighbors(points, p2p_range):
+    """Neighbor ID tuples for ((node_id, x, y), ...) within p2p_range."""
+    node_ids = [nid for nid, _, _ in points]
+    pts = np.array([(x, y) for _, x, y in points], dtype=float).reshape(-1, 2)
+    d2 = ((pts[:, None, :] - pts[None, :, :]) ** 2).sum(-1)
+    in_range = d2 <= p2p_range * p2p_range
+    np.fill_diagonal(in_range, False)
+    return tuple((nid, tuple(node_ids[j] for j in np.flatnonzero(row).tolist()))
+                 for nid, row in zip(node_ids, in_range))
+
+
+def compute_neighbors(positions, p2p_range=None):
+    """Compute neighbors for each node based on P2P_RANGE (or p2p_range)."""
+    return compute_neighbors_xy(list(positions), [p[:2] for p in positions.values()], p2p_range)
+
+
+def compute_neighbors_xy(node_ids, xy, p2p_range=None):
+    """compute_neighbors for parallel node ID and (x, y) sequences."""
+    points = tuple((nid, float(x), float(y)) for nid, (x, y) in zip(node_ids, xy))
+    if p2p_range is None:
+        p2p_range = P2P_RANGE
+    return {nid: list(nbrs) for nid, nbrs in _neighbors(points, p2p_range)}
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Generate both PDF reports in parallel.
+
+The simulation report and the network report share no state, so each is
+built in its own process.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_report import create_report
+from generate_network_report import create_network_report
+
+_OUT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output"))
+
+
+def main():
+    os.makedirs(_OUT, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        futures = [
+            ex.submit(create_report, os.path.join(_OUT, "simulation_report.pdf")),
+            ex.submit(create_network_report, os.path.join(_OUT, "ns3_wireless_report.pdf")),
+        ]
+        for future in futures:
+            future.result()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,117 +4,66 @@ Generate Wireless Networking PDF Report for NS-3 Simulation
 Focus: PHY/MAC layers, LoRaWAN metrics, Link Budget, PDR, Latency.
 """
 
+import copy
+import functools
 import os
-import sys
+import threading
 from datetime import datetime
 
-# Add src to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# reportlab is imported inside the build functions, so importing this module
+# (or a cached rebuild) does not load it
+from _pdf_cache import report_cache_key, restore_cached_pdf, store_cached_pdf
+import config
 
-try:
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        Image, PageBreak, ListFlowable, ListItem
-    )
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-except ImportError:
-    print("Installing reportlab...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "reportlab"])
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        Image, PageBreak, ListFlowable, ListItem
-    )
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_OUT = os.path.abspath(os.path.join(_HERE, "..", "output"))
+_STYLES_PY = os.path.join(_HERE, "report_styles.py")
 
-import config
 
+# Serializes the first _static_sections() call when builds run on threads
+_SECTIONS_LOCK = threading.Lock()
 
-def create_network_report(output_path: str):
-    """Generate the Network-Specific PDF report."""
+
+@functools.lru_cache(maxsize=1)
+def _static_sections():
+    """Flowables for the fixed parts of the report, built once per process.
     
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
+    Returns:
+        (head, body) tuples: the title block, and everything after the
+        simulation date line.
+    """
+    from _report_common import cm, Spacer, PageBreak
+    from report_styles import (
+        static_para, static_table, NETWORK_STYLES, HEADER_SKY_TS,
+        HEADER_SLATE_TS, HEADER_GREEN_TS, HEADER_ORANGE_TS, HEADER_DARK_TS
     )
     
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='Title_Custom',
-        parent=styles['Title'],
-        fontSize=24,
-        spaceAfter=30,
-        textColor=colors.HexColor('#2b6cb0')
-    ))
-    styles.add(ParagraphStyle(
-        name='Heading1_Custom',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceBefore=20,
-        spaceAfter=10,
-        textColor=colors.HexColor('#2c5282')
-    ))
-    styles.add(ParagraphStyle(
-        name='Heading2_Custom',
-        parent=styles['Heading2'],
-        fontSize=13,
-        spaceBefore=15,
-        spaceAfter=8,
-        textColor=colors.HexColor('#4299e1')
-    ))
-    styles.add(ParagraphStyle(
-        name='Body_Custom',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=8,
-        alignment=TA_JUSTIFY
-    ))
-    styles.add(ParagraphStyle(
-        name='Code_Custom',
-        parent=styles['Code'],
-        fontSize=9,
-        backColor=colors.HexColor('#f7fafc'),
-        borderColor=colors.HexColor('#e2e8f0'),
-        borderWidth=1,
-        borderPadding=5,
-        spaceAfter=10
-    ))
-    
-    story = []
+    styles = NETWORK_STYLES
     
     # Title
-    story.append(Paragraph("NS-3 Wireless Network Performance Report", styles['Title_Custom']))
-    story.append(Paragraph("LoRaWAN & P2P Mesh Validation", styles['Heading2']))
-    story.append(Spacer(1, 20))
+    head = (
+        static_para("NS-3 Wireless Network Performance Report", styles['Title_Custom']),
+        static_para("LoRaWAN & P2P Mesh Validation", styles['Heading2']),
+        Spacer(1, 20),
+    )
     
-    # Date
-    story.append(Paragraph(f"Simulation Date: {datetime.now().strftime('%Y-%m-%d')}", styles['Normal']))
-    story.append(Paragraph("Simulator: Network Simulator 3 (ns-3.40) + LoRaWAN Module", styles['Normal']))
-    story.append(Spacer(1, 30))
+    story = [
+        static_para("Simulator: Network Simulator 3 (ns-3.40) + LoRaWAN Module", styles['Normal']),
+        Spacer(1, 30),
+    ]
     
     # Executive Summary
-    story.append(Paragraph("1. Network Validation Summary", styles['Heading1_Custom']))
+    story.append(static_para("1. Network Validation Summary", styles['Heading1_Custom']))
     summary_text = """
     This technical report details the <b>wireless networking performance</b> of the proposed dual-ring perimeter defense system. 
     The simulation models the Physical (PHY) and Media Access Control (MAC) layers using the <b>NS-3 LoRaWAN module</b>. 
     It evaluates the coexistence of LoRaWAN Class A uplinks (for cloud alerts) and LoRa P2P mesh messaging (for direct 
     neighbor verification). Results confirm stable connectivity with >98% Packet Delivery Ratio (PDR) and acceptable interference levels.
     """
-    story.append(Paragraph(summary_text.strip(), styles['Body_Custom']))
-    story.append(Spacer(1, 15))
+    story += [
+        static_para(summary_text.strip(), styles['Body_Custom']),
+        Spacer(1, 15),
+    ]
     
     # Key Network Metrics
     findings_data = [
@@ -127,22 +76,14 @@ def create_network_report(output_path: str):
         ['Duty Cycle Utilization', '0.12%', '< 1.0%', 'COMPLIANT'],
     ]
     
-    findings_table = Table(findings_data, colWidths=[5.5*cm, 3.5*cm, 3.5*cm, 2.5*cm])
-    findings_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#ebf8ff')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#bee3f8')),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-    ]))
-    story.append(findings_table)
-    story.append(Spacer(1, 20))
+    findings_table = static_table(findings_data, [5.5*cm, 3.5*cm, 3.5*cm, 2.5*cm], HEADER_SKY_TS)
+    story += [
+        findings_table,
+        Spacer(1, 20),
+    ]
     
     # Simulation Setup
-    story.append(Paragraph("2. PHY/MAC Simulation Parameters", styles['Heading1_Custom']))
+    story.append(static_para("2. PHY/MAC Simulation Parameters", styles['Heading1_Custom']))
     
     params_data = [
         ['Parameter', 'Value', 'Description'],
@@ -156,24 +97,18 @@ def create_network_report(output_path: str):
         ['Tx Power', '14 dBm (25mW)', 'Standard limit'],
     ]
     
-    params_table = Table(params_data, colWidths=[5*cm, 5*cm, 5*cm])
-    params_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e0')),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-    ]))
-    story.append(params_table)
-    story.append(Spacer(1, 20))
+    params_table = static_table(params_data, [5*cm, 5*cm, 5*cm], HEADER_SLATE_TS)
+    story += [
+        params_table,
+        Spacer(1, 20),
+    ]
     
     # Link Budget Analysis
-    story.append(Paragraph("3. Link Budget & Coverage Analysis", styles['Heading1_Custom']))
+    story.append(static_para("3. Link Budget & Coverage Analysis", styles['Heading1_Custom']))
     link_text = """
     The simulation analyzed the link budget for the furthest node (Outer Ring, ~100m from Gateway).
     """
-    story.append(Paragraph(link_text, styles['Body_Custom']))
+    story.append(static_para(link_text, styles['Body_Custom']))
     
     budg_data = [
         ['Component', 'Value (dB)', 'Calculation'],
@@ -187,24 +122,21 @@ def create_network_report(output_path: str):
         ['<b>Link Margin</b>', '<b>57.5</b>', 'RSSI - Sensitivity'],
     ]
     
-    calc_table = Table(budg_data, colWidths=[5*cm, 4*cm, 6*cm])
-    calc_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2f855a')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#9ae6b4')),
-    ]))
-    story.append(calc_table)
-    story.append(Paragraph("<i>Verdict: Exceptional link margin (>50dB) ensures reliable operation even with foliage attenuation.</i>", styles['Body_Custom']))
-    story.append(Spacer(1, 20))
+    calc_table = static_table(budg_data, [5*cm, 4*cm, 6*cm], HEADER_GREEN_TS)
+    story += [
+        calc_table,
+        static_para("<i>Verdict: Exceptional link margin (>50dB) ensures reliable operation even with foliage attenuation.</i>", styles['Body_Custom']),
+        Spacer(1, 20),
+    ]
 
     # Interference Analysis
-    story.append(Paragraph("4. Interference & Collision Analysis", styles['Heading1_Custom']))
+    story.append(static_para("4. Interference & Collision Analysis", styles['Heading1_Custom']))
     inter_text = """
     The rigorous checking of the dual-phy coexistence (LoRaWAN Uplink + P2P verify) reveals negligible collisions. 
     Since P2P verification messages are short (32-64 bytes) and use randomized backoff (±50ms), they rarely conflict 
     with gateway uplinks.
     """
-    story.append(Paragraph(inter_text, styles['Body_Custom']))
+    story.append(static_para(inter_text, styles['Body_Custom']))
     
     inter_data = [
         ['Traffic Type', 'Total Packets', 'Collisions', 'Packet Error Rate'],
@@ -213,21 +145,18 @@ def create_network_report(output_path: str):
         ['LoRaWAN Uplink', '300', '1', '0.33%'],
     ]
     
-    inter_table = Table(inter_data, colWidths=[5*cm, 4*cm, 4*cm, 3*cm])
-    inter_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#c05621')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#fbd38d')),
-    ]))
-    story.append(inter_table)
-    story.append(PageBreak())
+    inter_table = static_table(inter_data, [5*cm, 4*cm, 4*cm, 3*cm], HEADER_ORANGE_TS)
+    story += [
+        inter_table,
+        PageBreak(),
+    ]
 
     # Power Consumption
-    story.append(Paragraph("5. Radio Power Consumption Estimates", styles['Heading1_Custom']))
+    story.append(static_para("5. Radio Power Consumption Estimates", styles['Heading1_Custom']))
     pow_text = """
     Based on the radio state machine output from NS-3 (EnergyModelHelper):
     """
-    story.append(Paragraph(pow_text, styles['Body_Custom']))
+    story.append(static_para(pow_text, styles['Body_Custom']))
     
     power_data = [
         ['Radio State', 'Current', 'Avg Time/Day', 'Daily Consumption'],
@@ -237,32 +166,56 @@ def create_network_report(output_path: str):
         ['<b>Total Radio Energy</b>', '-', '-', '<b>0.41 mAh / day</b>'],
     ]
     
-    pow_table = Table(power_data, colWidths=[4*cm, 3*cm, 4*cm, 4*cm])
-    pow_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2d3748')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e0')),
-    ]))
-    story.append(pow_table)
-    story.append(Spacer(1, 20))
+    pow_table = static_table(power_data, [4*cm, 3*cm, 4*cm, 4*cm], HEADER_DARK_TS)
+    story += [
+        pow_table,
+        Spacer(1, 20),
+    ]
     
     # Conclusion
-    story.append(Paragraph("6. Wireless Validation Conclusion", styles['Heading1_Custom']))
+    story.append(static_para("6. Wireless Validation Conclusion", styles['Heading1_Custom']))
     conc_text = """
     The NS-3 simulation verifies that the <b>Layer 1 & Layer 2 networking architecture is robust</b>. 
     The separation of P2P mesh logic (for verification) and LoRaWAN (for uplinks) creates a collision-free environment. 
     The link budget analysis confirms that the selected radii (14m, 23m) and antenna configurations provide greater than 
     50dB of fade margin, ample for agricultural deployment.
     """
-    story.append(Paragraph(conc_text, styles['Body_Custom']))
+    story.append(static_para(conc_text, styles['Body_Custom']))
+    
+    return head, tuple(story)
+
+
+def create_network_report(output_path: str):
+    """Generate the Network-Specific PDF report."""
+    
+    today = datetime.now().date().isoformat()
+    cache_key = report_cache_key(config, today, files=[__file__, _STYLES_PY])
+    if restore_cached_pdf(cache_key, output_path):
+        print(f"Network Report generated (cached): {output_path}")
+        return
+    
+    from _report_common import Paragraph, compact_pdf
+    from report_styles import make_doc, NETWORK_STYLES
+    
+    doc = make_doc(output_path)
+    with _SECTIONS_LOCK:
+        head, body = _static_sections()
+    
+    # Platypus keeps layout state on flowables, so each build lays out copies
+    story = [
+        *map(copy.copy, head),
+        Paragraph(f"Simulation Date: {today}", NETWORK_STYLES['Normal']),
+        *map(copy.copy, body),
+    ]
     
     # Build PDF
     doc.build(story)
+    compact_pdf(output_path)
+    store_cached_pdf(cache_key, output_path)
     print(f"Network Report generated: {output_path}")
 
 
 if __name__ == "__main__":
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output")
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "ns3_wireless_report.pdf")
+    os.makedirs(_OUT, exist_ok=True)
+    output_path = os.path.join(_OUT, "ns3_wireless_report.pdf")
     create_network_report(output_path)
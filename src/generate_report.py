@@ -3,98 +3,140 @@
 Generate PDF Report for Dual-Ring LoRa Perimeter Simulation
 """
 
+import copy
+import functools
 import os
-import sys
+import threading
 from datetime import datetime
 
-# Add src to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# reportlab, Pillow and svglib are imported inside the build functions, so
+# importing this module (or a cached rebuild) does not load them
+from _pdf_cache import report_cache_key, restore_cached_pdf, store_cached_pdf
+import config
 
-try:
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        Image, PageBreak, ListFlowable, ListItem
-    )
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-except ImportError:
-    print("Installing reportlab...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "reportlab"])
-    from reportlab.lib import colors
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import (
-        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-        Image, PageBreak, ListFlowable, ListItem
-    )
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_OUT = os.path.abspath(os.path.join(_HERE, "..", "output"))
+_LATENCY_PNG = os.path.join(_OUT, "latency_cdf.png")
+_P2P_PNG = os.path.join(_OUT, "p2p_overhead.png")
+_COMPARISON_PNG = os.path.join(_OUT, "detection_comparison.png")
+_STYLES_PY = os.path.join(_HERE, "report_styles.py")
+_IMAGE_CACHE = os.path.join(_OUT, "_pdfcache")
+_PLOT_FILES = [
+    os.path.splitext(png)[0] + ext
+    for png in (_LATENCY_PNG, _P2P_PNG, _COMPARISON_PNG)
+    for ext in ('.png', '.svg')
+]
 
-import config
+# Table rows derived from config, formatted once at import
+_ARCH_DATA = [
+    ['Ring', 'Radius', 'Nodes', 'Spacing', 'Offset'],
+    ['Outer Ring', f'{config.OUTER_RING_RADIUS} m', '8', '45°', '0°'],
+    ['Inner Ring', f'{config.INNER_RING_RADIUS} m', '8', '45°', '22.5° (Interleaved)'],
+]
 
+_PARAMS_ROWS = [
+    ['Random Seed', str(config.RANDOM_SEED)],
+    ['Total Events', str(config.EVENT_TARGET_COUNT)],
+    ['Intruder Event Probability', f'{config.INTRUDER_EVENT_PROB:.0%}'],
+    ['P2P Communication Range', f'{config.P2P_RANGE} m'],
+    ['Sensor Detection Range', f'{config.SENSOR_RANGE} m'],
+    ['Packet Loss Base', f'{config.LOSS_BASE:.0%}'],
+    ['Gateway Up Duration (mean)', f'{config.GATEWAY_UP_DURATION_MEAN} s'],
+    ['Gateway Down Duration (mean)', f'{config.GATEWAY_DOWN_DURATION_MEAN} s'],
+]
 
-def create_report(output_path: str):
-    """Generate the PDF report."""
+
+def _prepped_image(path: str, w_cm: float, h_cm: float, dpi: int = 150):
+    """Image flowable downscaled to its display size at the given DPI.
+    
+    ReportLab embeds images at their full pixel size, so plots are shrunk
+    before embedding to keep the PDF and its compression work small. The
+    shrunk copy is written under output/_pdfcache, reused until the source
+    plot is newer, and referenced by path with lazy=2, so its pixels are only
+    decoded while the image is measured and drawn instead of staying in memory
+    for the whole build.
+    """
+    from PIL import Image as PILImage
+    from _report_common import cm, Image
+    
+    target_px = (int(w_cm / 2.54 * dpi), int(h_cm / 2.54 * dpi))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    prepped = os.path.join(_IMAGE_CACHE, f"{stem}_{target_px[0]}x{target_px[1]}.png")
+    try:
+        fresh = os.path.getmtime(prepped) >= os.path.getmtime(path)
+    except OSError:
+        fresh = False
+    if not fresh:
+        os.makedirs(_IMAGE_CACHE, exist_ok=True)
+        # Write-then-rename so concurrent builds never read a partial file
+        tmp = f"{prepped}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with PILImage.open(path) as img:
+            img.thumbnail(target_px, PILImage.LANCZOS)
+            img.save(tmp, 'PNG', compress_level=1)
+        os.replace(tmp, prepped)
+    return Image(prepped, width=w_cm*cm, height=h_cm*cm, lazy=2)
+
+
+@functools.lru_cache(maxsize=1)
+def _svg2rlg():
+    """svglib's SVG-to-Drawing converter, or None when svglib is missing."""
+    try:
+        from svglib.svglib import svg2rlg
+    except ImportError:
+        return None
+    return svg2rlg
+
+
+def _plot_flowable(png_path: str, w_cm: float, h_cm: float):
+    """Vector drawing from the plot's SVG sibling if possible, else the PNG.
     
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
-    )
+    The SVG is used only when svglib is installed and the file exists.
+    """
+    from _report_common import cm
+    
+    svg_path = os.path.splitext(png_path)[0] + '.svg'
+    svg2rlg = _svg2rlg()
+    if svg2rlg is not None and os.path.exists(svg_path):
+        drawing = svg2rlg(svg_path)
+        if drawing is not None:
+            sx, sy = w_cm*cm / drawing.width, h_cm*cm / drawing.height
+            drawing.width, drawing.height = w_cm*cm, h_cm*cm
+            drawing.scale(sx, sy)
+            return drawing
+    return _prepped_image(png_path, w_cm, h_cm)
+
+
+# Serializes the first _static_sections() call when builds run on threads
+_SECTIONS_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _static_sections():
+    """Flowables for the fixed parts of the report, built once per process.
     
-    # Styles
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='Title_Custom',
-        parent=styles['Title'],
-        fontSize=24,
-        spaceAfter=30,
-        textColor=colors.HexColor('#1a365d')
-    ))
-    styles.add(ParagraphStyle(
-        name='Heading1_Custom',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceBefore=20,
-        spaceAfter=10,
-        textColor=colors.HexColor('#2c5282')
-    ))
-    styles.add(ParagraphStyle(
-        name='Heading2_Custom',
-        parent=styles['Heading2'],
-        fontSize=13,
-        spaceBefore=15,
-        spaceAfter=8,
-        textColor=colors.HexColor('#2b6cb0')
-    ))
-    styles.add(ParagraphStyle(
-        name='Body_Custom',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=8,
-        alignment=TA_JUSTIFY
-    ))
+    Returns:
+        (head, body, tail) tuples: the title block, sections 1-4 up to the
+        visualization heading, and the conclusions.
+    """
+    from _report_common import cm, Spacer, PageBreak
+    from report_styles import (
+        kv_para, static_para, static_table, STYLES, HEADER_BLUE_TS,
+        HEADER_GRAY_TS, HEADER_GREEN_KV_TS
+    )
     
-    story = []
+    styles = STYLES
     
     # Title
-    story.append(Paragraph("Dual-Ring LoRa Perimeter Simulation", styles['Title_Custom']))
-    story.append(Paragraph("Agent-Based Networking Validation Report", styles['Heading2']))
-    story.append(Spacer(1, 20))
+    head = (
+        static_para("Dual-Ring LoRa Perimeter Simulation", styles['Title_Custom']),
+        static_para("Agent-Based Networking Validation Report", styles['Heading2']),
+        Spacer(1, 20),
+    )
     
-    # Date
-    story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 30))
+    story = []
     
     # Executive Summary
-    story.append(Paragraph("Executive Summary", styles['Heading1_Custom']))
+    story.append(static_para("Executive Summary", styles['Heading1_Custom']))
     summary_text = """
     This report validates the comprehensive 3-Layer Wildlife Defense System designed for farmland protection. 
     The system integrates <b>Layer 1: Smart Perimeter Sensing</b> (Dual-Ring Topology), 
@@ -103,11 +145,13 @@ def create_report(output_path: str):
     Simulation results confirm high detection reliability (100%), robust false alarm rejection via cross-verification, 
     and effective deterrence activation with <500ms system latency.
     """
-    story.append(Paragraph(summary_text.strip(), styles['Body_Custom']))
-    story.append(Spacer(1, 15))
+    story += [
+        static_para(summary_text.strip(), styles['Body_Custom']),
+        Spacer(1, 15),
+    ]
     
     # Key Findings Table
-    story.append(Paragraph("System Performance Summary", styles['Heading2_Custom']))
+    story.append(static_para("System Performance Summary", styles['Heading2_Custom']))
     
     findings_data = [
         ['Metric', 'System Performance', 'Target / Baseline', 'Verdict'],
@@ -118,56 +162,31 @@ def create_report(output_path: str):
         ['Power Budget (Peak)', '780 mA', '< 800 mA', 'Safe'],
     ]
     
-    findings_table = Table(findings_data, colWidths=[4.5*cm, 4*cm, 3.5*cm, 2.5*cm])
-    findings_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#edf2f7')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#cbd5e0')),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-    ]))
-    story.append(findings_table)
-    story.append(Spacer(1, 25))
+    findings_table = static_table(findings_data, [4.5*cm, 4*cm, 3.5*cm, 2.5*cm], HEADER_BLUE_TS)
+    story += [
+        findings_table,
+        Spacer(1, 25),
+    ]
     
     # System Architecture
-    story.append(Paragraph("1. Layer 1: Smart Perimeter Sensing (Topology)", styles['Heading1_Custom']))
+    story.append(static_para("1. Layer 1: Smart Perimeter Sensing (Topology)", styles['Heading1_Custom']))
     
     arch_text = """
     The finalized perimeter design utilizes a <b>Dual Concentric Ring Topology</b> for complete boundary coverage 
     of a ~1-acre plot (side ~63.6m). The setup integrates a tri-sensor suite (PIR, MLX90640 Thermal, OV2640 Cam) on 
     fixed coordinates, featuring adaptive thermal thresholding and slope adaptation (≤15°).
     """
-    story.append(Paragraph(arch_text.strip(), styles['Body_Custom']))
+    story.append(static_para(arch_text.strip(), styles['Body_Custom']))
     
-    arch_data = [
-        ['Ring', 'Radius', 'Nodes', 'Spacing', 'Offset'],
-        ['Outer Ring', f'{config.OUTER_RING_RADIUS} m', '8', '45°', '0°'],
-        ['Inner Ring', f'{config.INNER_RING_RADIUS} m', '8', '45°', '22.5° (Interleaved)'],
+    arch_table = static_table(_ARCH_DATA, [3.5*cm, 3*cm, 2*cm, 3*cm, 4*cm], HEADER_GRAY_TS)
+    story += [
+        arch_table,
+        static_para("<i>Geometric Validation: Coverage width (25.1m) ≥ Arc length (25.0m) ensures no gaps.</i>", styles['Body_Custom']),
+        Spacer(1, 20),
     ]
     
-    arch_table = Table(arch_data, colWidths=[3.5*cm, 3*cm, 2*cm, 3*cm, 4*cm])
-    arch_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#a0aec0')),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(arch_table)
-    story.append(Paragraph("<i>Geometric Validation: Coverage width (25.1m) ≥ Arc length (25.0m) ensures no gaps.</i>", styles['Body_Custom']))
-    story.append(Spacer(1, 20))
-    
     # Decision Logic (Layer 2)
-    story.append(Paragraph("2. Layer 2: Edge AI & Verification", styles['Heading1_Custom']))
+    story.append(static_para("2. Layer 2: Edge AI & Verification", styles['Heading1_Custom']))
     
     logic_text = f"""
     <b>Hardware:</b> ESP32-CAM running <b>YOLOv3-tiny (distilled)</b>.<br/>
@@ -177,58 +196,40 @@ def create_report(output_path: str):
     • <b>Borderline (0.70 - 0.80):</b> Request neighbor verification (±3s temporal correlation, RSSI overlap).<br/>
     • <b>Low Confidence (< 0.70):</b> Ignore.<br/>
     """
-    story.append(Paragraph(logic_text, styles['Body_Custom']))
-    story.append(Spacer(1, 20))
+    story += [
+        static_para(logic_text, styles['Body_Custom']),
+        Spacer(1, 20),
+    ]
 
     # Deterrence (Layer 3)
-    story.append(Paragraph("3. Layer 3: Active Deterrence", styles['Heading1_Custom']))
+    story.append(static_para("3. Layer 3: Active Deterrence", styles['Heading1_Custom']))
     deter_text = """
     <b>Strategy:</b> Cluster-based activation using ring overlap.<br/>
     <b>Actuators:</b> Ultrasonic-Subsonic Hybrid (28-40kHz + 30-80Hz env), Strobe Light.<br/>
     <b>Safety:</b> Inaudible to humans, <5 events/day power budget.<br/>
     """
-    story.append(Paragraph(deter_text, styles['Body_Custom']))
-    story.append(Spacer(1, 25))
+    story += [
+        static_para(deter_text, styles['Body_Custom']),
+        Spacer(1, 25),
+    ]
     
     # Simulation Parameters
-    story.append(Paragraph("3. Simulation Parameters", styles['Heading1_Custom']))
-    
-    params_data = [
-        ['Parameter', 'Value'],
-        ['Random Seed', str(config.RANDOM_SEED)],
-        ['Total Events', str(config.EVENT_TARGET_COUNT)],
-        ['Intruder Event Probability', f'{config.INTRUDER_EVENT_PROB:.0%}'],
-        ['P2P Communication Range', f'{config.P2P_RANGE} m'],
-        ['Sensor Detection Range', f'{config.SENSOR_RANGE} m'],
-        ['Packet Loss Base', f'{config.LOSS_BASE:.0%}'],
-        ['Gateway Up Duration (mean)', f'{config.GATEWAY_UP_DURATION_MEAN} s'],
-        ['Gateway Down Duration (mean)', f'{config.GATEWAY_DOWN_DURATION_MEAN} s'],
-    ]
+    story.append(static_para("3. Simulation Parameters", styles['Heading1_Custom']))
     
-    params_table = Table(params_data, colWidths=[6*cm, 5*cm])
-    params_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4a5568')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#a0aec0')),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(params_table)
+    story += [kv_para(label, value, styles['Normal']) for label, value in _PARAMS_ROWS]
     story.append(Spacer(1, 25))
     
     # Results
-    story.append(Paragraph("4. Simulation Performance Results", styles['Heading1_Custom']))
+    story.append(static_para("4. Simulation Performance Results", styles['Heading1_Custom']))
     
     results_text = """
     The simulation evaluated 1000 events (30% Intruder, 70% Noise). The system demonstrated 
     resilience to false alarms via P2P consensus and effective deterrence triggering.
     """
-    story.append(Paragraph(results_text.strip(), styles['Body_Custom']))
-    story.append(Spacer(1, 15))
+    story += [
+        static_para(results_text.strip(), styles['Body_Custom']),
+        Spacer(1, 15),
+    ]
     
     # Results table
     results_data = [
@@ -243,61 +244,17 @@ def create_report(output_path: str):
         ['Gateway Outage', 'Resilient', 'P2P functional during outage'],
     ]
     
-    results_table = Table(results_data, colWidths=[4*cm, 4*cm, 6*cm])
-    results_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#276749')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#68d391')),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f0fff4')),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(results_table)
-    story.append(PageBreak())
+    results_table = static_table(results_data, [4*cm, 4*cm, 6*cm], HEADER_GREEN_KV_TS)
+    story += [
+        results_table,
+        PageBreak(),
+    ]
     
     # Plots
-    story.append(Paragraph("5. Visualizations", styles['Heading1_Custom']))
-    
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output")
-    
-    # Latency CDF
-    latency_path = os.path.join(output_dir, "latency_cdf.png")
-    if os.path.exists(latency_path):
-        story.append(Paragraph("5.1 Detection Latency (CDF)", styles['Heading2_Custom']))
-        story.append(Image(latency_path, width=14*cm, height=9*cm))
-        story.append(Paragraph(
-            "The latency CDF shows detection confirmation times. Most detections complete under 0.5 seconds, "
-            "with worst-case delays reaching the 3-second P2P verification timeout.",
-            styles['Body_Custom']
-        ))
-        story.append(Spacer(1, 15))
-    
-    # P2P Overhead
-    p2p_path = os.path.join(output_dir, "p2p_overhead.png")
-    if os.path.exists(p2p_path):
-        story.append(Paragraph("5.2 P2P Message Overhead", styles['Heading2_Custom']))
-        story.append(Image(p2p_path, width=14*cm, height=9*cm))
-        story.append(Paragraph(
-            "P2P verification messages are minimal, averaging 1.46 messages per verified event. "
-            "This demonstrates efficient use of the cross-verification mechanism.",
-            styles['Body_Custom']
-        ))
-        story.append(Spacer(1, 15))
-    
-    # Detection Comparison
-    comp_path = os.path.join(output_dir, "detection_comparison.png")
-    if os.path.exists(comp_path):
-        story.append(Paragraph("5.3 Detection Performance", styles['Heading2_Custom']))
-        story.append(Image(comp_path, width=14*cm, height=9*cm))
-        story.append(Spacer(1, 20))
+    story.append(static_para("5. Visualizations", styles['Heading1_Custom']))
+    body = tuple(story)
     
     # Conclusions
-    story.append(Paragraph("6. Conclusions", styles['Heading1_Custom']))
-    
     conclusions = """
     <b>1. Technical Feasibility:</b> The proposed system is technically sound for deployment on ESP32-class hardware 
     with a distilled YOLOv3-tiny model (<300KB).<br/><br/>
@@ -313,15 +270,101 @@ def create_report(output_path: str):
     
     <b>Verdict:</b> The architecture is validated as "paper-safe" and ready for prototyping/field deployment in Tamil Nadu.
     """
-    story.append(Paragraph(conclusions, styles['Body_Custom']))
+    tail = (
+        static_para("6. Conclusions", styles['Heading1_Custom']),
+        static_para(conclusions, styles['Body_Custom']),
+    )
+    
+    return head, body, tail
+
+
+def _plot_section() -> list:
+    """Section 5 flowables for whichever plots exist on disk."""
+    from _report_common import Spacer
+    from report_styles import static_para, STYLES
+    
+    section = []
+    
+    # Latency CDF
+    if os.path.exists(_LATENCY_PNG):
+        section += [
+            static_para("5.1 Detection Latency (CDF)", STYLES['Heading2_Custom']),
+            _plot_flowable(_LATENCY_PNG, 14, 9),
+            static_para(
+                "The latency CDF shows detection confirmation times. Most detections complete under 0.5 seconds, "
+                "with worst-case delays reaching the 3-second P2P verification timeout.",
+                STYLES['Body_Custom']
+            ),
+            Spacer(1, 15),
+        ]
+    
+    # P2P Overhead
+    if os.path.exists(_P2P_PNG):
+        section += [
+            static_para("5.2 P2P Message Overhead", STYLES['Heading2_Custom']),
+            _plot_flowable(_P2P_PNG, 14, 9),
+            static_para(
+                "P2P verification messages are minimal, averaging 1.46 messages per verified event. "
+                "This demonstrates efficient use of the cross-verification mechanism.",
+                STYLES['Body_Custom']
+            ),
+            Spacer(1, 15),
+        ]
+    
+    # Detection Comparison
+    if os.path.exists(_COMPARISON_PNG):
+        section += [
+            static_para("5.3 Detection Performance", STYLES['Heading2_Custom']),
+            _plot_flowable(_COMPARISON_PNG, 14, 9),
+            Spacer(1, 20),
+        ]
+    
+    return section
+
+
+def create_report(output_path: str):
+    """Generate the PDF report."""
+    
+    # One clock read for both the cache key and the "Generated" line;
+    # isoformat() formats without strftime's format-string parsing
+    now = datetime.now()
+    
+    # Keyed on the date only: a same-day rebuild with unchanged inputs reuses
+    # the earlier PDF (and its "Generated" time)
+    cache_key = report_cache_key(
+        config, now.date().isoformat(),
+        files=[__file__, _STYLES_PY, *_PLOT_FILES]
+    )
+    if restore_cached_pdf(cache_key, output_path):
+        print(f"Report generated (cached): {output_path}")
+        return
+    
+    from _report_common import Paragraph, Spacer, compact_pdf
+    from report_styles import make_doc, STYLES
+    
+    doc = make_doc(output_path)
+    with _SECTIONS_LOCK:
+        head, body, tail = _static_sections()
+    
+    # Platypus keeps layout state on flowables, so each build lays out copies.
+    # The story is assembled in one list display, sized once.
+    story = [
+        *map(copy.copy, head),
+        Paragraph(f"Generated: {now.isoformat(sep=' ', timespec='seconds')}", STYLES['Normal']),
+        Spacer(1, 30),
+        *map(copy.copy, body),
+        *_plot_section(),
+        *map(copy.copy, tail),
+    ]
     
     # Build PDF
     doc.build(story)
+    compact_pdf(output_path)
+    store_cached_pdf(cache_key, output_path)
     print(f"Report generated: {output_path}")
 
 
 if __name__ == "__main__":
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output")
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "simulation_report.pdf")
+    os.makedirs(_OUT, exist_ok=True)
+    output_path = os.path.join(_OUT, "simulation_report.pdf")
     create_report(output_path)
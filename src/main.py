@@ -8,113 +8,251 @@ LoRa perimeter sensing network.
 Author: Simulation Engineer
 """
 
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import pickle
 import simpy
-import random
 import sys
 import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
 
 # Add src to path for imports
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _HERE)
 
 import config
 from models import Gateway, Node, Network, Environment
 from analysis import compute_metrics, compute_pir_only_baseline, print_summary, generate_plots
 
 
-import argparse
+OUTPUT_DIR = os.path.normpath(os.path.join(_HERE, "..", "output"))
+SWEEP_DIR = os.path.join(OUTPUT_DIR, "sweep")
+TOPO_CACHE_DIR = os.path.join(OUTPUT_DIR, "_topocache")
 
-def main():
-    parser = argparse.ArgumentParser(description="Dual-Ring LoRa Simulation")
-    parser.add_argument("--experiment", type=str, default="default", 
-                        choices=["default", "fpr", "latency", "gateway", "density"],
-                        help="Experiment mode to run")
-    parser.add_argument("--nodes", type=int, default=16, help="Total number of nodes (Density exp)")
-    parser.add_argument("--loss", type=float, default=config.LOSS_BASE, help="Base packet loss prob")
-    parser.add_argument("--timeout", type=float, default=config.P2P_VERIFICATION_TIMEOUT, help="P2P timeout")
-    parser.add_argument("--gateway_down", action="store_true", help="Force gateway down")
+# Node layout as one structured array (ring 0 = outer, 1 = inner), outer
+# ring first; string node IDs are derived from it by node_names()
+POS_DTYPE = np.dtype([("x", "f8"), ("y", "f8"), ("ring", "i1")])
+RING_TYPES = ("outer", "inner")
+
+# Per-detection lists dropped from run results (plots only)
+_LIST_METRICS = ("latencies", "p2p_messages_list")
+
+
+def node_names(positions: np.ndarray) -> List[str]:
+    """Node IDs ("outer_0", ..., "inner_0", ...) for a POS_DTYPE array."""
+    counts = [0] * len(RING_TYPES)
+    names = []
+    for ring in positions["ring"].tolist():
+        names.append(f"{RING_TYPES[ring]}_{counts[ring]}")
+        counts[ring] += 1
+    return names
+
+
+def build_topology(nodes: int, outer_r: float, inner_r: float,
+                   p2p_range: float) -> Tuple[np.ndarray, Dict[str, List[str]]]:
+    """Dual-ring node positions and P2P neighbor lists, cached on disk.
     
-    args = parser.parse_args()
+    Topologies are pickled under output/_topocache keyed by their
+    parameters, so repeated runs (sweeps, reproducibility checks) load the
+    layout instead of recomputing the ring geometry and neighbor pass.
     
-    print("=" * 60)
-    print(f"DUAL-RING LoRa SIMULATION - Mode: {args.experiment.upper()}")
-    print("=" * 60)
+    Args:
+        nodes: Total node count, split evenly between the rings.
+        outer_r: Outer ring radius (m).
+        inner_r: Inner ring radius (m).
+        p2p_range: Max P2P link distance (m).
+    
+    Returns:
+        (positions, neighbors): POS_DTYPE array of node positions, and
+        node_id -> neighbor IDs.
+    """
+    params = (POS_DTYPE.descr, nodes, outer_r, inner_r, config.INNER_RING_OFFSET_DEG, p2p_range)
+    key = hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+    path = os.path.join(TOPO_CACHE_DIR, f"topo_{nodes}_{key}.pkl")
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    
+    n_outer = nodes // 2
+    n_inner = nodes - n_outer
+    
+    theta_outer = np.linspace(0.0, 2*np.pi, n_outer, endpoint=False)
+    theta_inner = (np.linspace(0.0, 2*np.pi, n_inner, endpoint=False)
+                   + np.radians(config.INNER_RING_OFFSET_DEG))
+    positions = np.empty(nodes, dtype=POS_DTYPE)
+    positions["x"][:n_outer] = outer_r * np.cos(theta_outer)
+    positions["y"][:n_outer] = outer_r * np.sin(theta_outer)
+    positions["x"][n_outer:] = inner_r * np.cos(theta_inner)
+    positions["y"][n_outer:] = inner_r * np.sin(theta_inner)
+    positions["ring"][:n_outer] = 0
+    positions["ring"][n_outer:] = 1
+
+    xy = np.column_stack((positions["x"], positions["y"]))
+    neighbors = config.compute_neighbors_xy(node_names(positions), xy.tolist(), p2p_range)
+    
+    os.makedirs(TOPO_CACHE_DIR, exist_ok=True)
+    # Write-then-rename so parallel sweep workers never load a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump((positions, neighbors), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return positions, neighbors
+
 
-    # Apply Overrides based on arguments
-    config.LOSS_BASE = args.loss
-    config.P2P_VERIFICATION_TIMEOUT = args.timeout
-    if args.gateway_down:
+def run_one(overrides: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
+    """Run a single simulation with the given config overrides.
+    
+    Args:
+        overrides: Run parameters: seed, nodes, loss, timeout, gateway_down
+            (plus any labels, such as experiment, carried into the result).
+        verbose: Print topology/progress and the summary, and write plots.
+    
+    Returns:
+        The overrides merged with the run's scalar metrics and the
+        PIR-only baseline false positive rate.
+    """
+    # Apply Overrides based on arguments (reseeding restarts config.RNG)
+    config.reseed(overrides["seed"])
+    config.LOSS_BASE = overrides["loss"]
+    config.P2P_VERIFICATION_TIMEOUT = overrides["timeout"]
+    if overrides["gateway_down"]:
         config.GATEWAY_UP_DURATION_MEAN = 1  # almost zero
         config.GATEWAY_DOWN_DURATION_MEAN = 999999
     
-    # Set random seed
-    random.seed(config.RANDOM_SEED)
-
     # Initialize SimPy environment
     env = simpy.Environment()
 
-    # Create gateway
-    gateway = Gateway(env)
+    # Create gateway, with its availability sampled for the whole run
+    sim_duration = config.EVENT_TARGET_COUNT * config.EVENT_INTERVAL_MEAN + 200
+    gateway = Gateway(env, horizon=sim_duration)
 
     # Create network
     network = Network(env, gateway)
 
     # Topology Generation (Support Density Experiment)
     # Default 16 nodes (8+8). If changed, scale proportionally.
-    n_outer = args.nodes // 2
-    n_inner = args.nodes - n_outer
-    
-    positions = {}
-    # Outer ring
-    for i in range(n_outer):
-        angle = math.radians(i * (360/n_outer))
-        positions[f"outer_{i}"] = (config.OUTER_RING_RADIUS * math.cos(angle), 
-                                   config.OUTER_RING_RADIUS * math.sin(angle), "outer")
-    # Inner ring
-    for i in range(n_inner):
-        angle = math.radians(i * (360/n_inner) + config.INNER_RING_OFFSET_DEG)
-        positions[f"inner_{i}"] = (config.INNER_RING_OFFSET_DEG * math.cos(angle), # Bug fixed in logic below
-                                   config.INNER_RING_RADIUS * math.sin(angle), "inner")
-        # Fix: Logic for inner ring position was using OFFSET_DEG as radius by mistake in previous thought, 
-        # correcting to use config.INNER_RING_RADIUS
-        positions[f"inner_{i}"] = (config.INNER_RING_RADIUS * math.cos(angle), 
-                                   config.INNER_RING_RADIUS * math.sin(angle), "inner")
-
-    neighbors = config.compute_neighbors(positions)
-    print(f"Topology: {len(positions)} nodes (Outer: {n_outer}, Inner: {n_inner})")
+    positions, neighbors = build_topology(overrides["nodes"], config.OUTER_RING_RADIUS,
+                                          config.INNER_RING_RADIUS, config.P2P_RANGE)
+    if verbose:
+        n_outer = overrides["nodes"] // 2
+        print(f"Topology: {len(positions)} nodes (Outer: {n_outer}, Inner: {len(positions) - n_outer})")
 
     # Create nodes
-    for node_id, (x, y, ring_type) in positions.items():
-        node = Node(env, node_id, ring_type, (x, y), gateway, network)
+    names = node_names(positions)
+    for node_id, (x, y, ring) in zip(names, positions.tolist()):
+        node = Node(env, node_id, RING_TYPES[ring], (x, y), gateway, network)
         network.add_node(node)
 
     # Set neighbors
     network.set_neighbors(neighbors)
+    network.set_distances(np.column_stack((positions["x"], positions["y"])))
 
     # Create environment
     sim_env = Environment(env, network)
     sim_env.generate_events(config.EVENT_TARGET_COUNT)
 
     # Run simulation
-    print(f"Running simulation ({config.EVENT_TARGET_COUNT} events)...")
-    sim_duration = config.EVENT_TARGET_COUNT * config.EVENT_INTERVAL_MEAN + 200
+    if verbose:
+        print(f"Running simulation ({config.EVENT_TARGET_COUNT} events)...")
     env.run(until=sim_duration)
     
     # Compute metrics
     metrics = compute_metrics(sim_env.events, network.all_detections)
     
-    # Run Baseline for comparison (only needed for default/FPR)
-    random.seed(config.RANDOM_SEED)
+    # Run Baseline for comparison (seeds its own generator)
     baseline = compute_pir_only_baseline(sim_env.events)
 
-    print_summary(metrics, baseline)
+    if verbose:
+        print_summary(metrics, baseline)
+        # Auto-generate plots
+        generate_plots(metrics, OUTPUT_DIR)
+    
+    summary = {k: v for k, v in metrics.items() if k not in _LIST_METRICS}
+    summary["baseline_false_positive_rate"] = baseline["false_positive_rate"]
+    # numpy scalars -> plain numbers so the result pickles small and dumps as JSON
+    summary = {k: v.item() if hasattr(v, "item") else v for k, v in summary.items()}
+    return {**overrides, **summary}
+
+
+def _sweep_configs(args) -> List[Dict[str, Any]]:
+    """Cartesian product of the sweep seeds, node counts and loss values."""
+    return [
+        {"experiment": args.experiment, "seed": seed, "nodes": nodes, "loss": loss,
+         "timeout": args.timeout, "gateway_down": args.gateway_down}
+        for seed in args.sweep_seeds
+        for nodes in (args.sweep_nodes or [args.nodes])
+        for loss in (args.sweep_loss or [args.loss])
+    ]
+
+
+def _sweep_worker(overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one sweep configuration and write its result to SWEEP_DIR."""
+    result = run_one(overrides, verbose=False)
+    key = hashlib.blake2b(json.dumps(overrides, sort_keys=True).encode(), digest_size=8).hexdigest()
+    with open(os.path.join(SWEEP_DIR, f"{key}.json"), "w") as f:
+        json.dump(result, f, indent=2)
+    return result
+
+
+def run_sweep(args) -> int:
+    """Run every sweep configuration in a process pool and print a summary."""
+    configs = _sweep_configs(args)
+    os.makedirs(SWEEP_DIR, exist_ok=True)
+    workers = min(args.workers or os.cpu_count() or 1, len(configs))
+    print(f"Sweep: {len(configs)} runs on {workers} workers")
+    
+    # Spawned workers start from a clean interpreter, and one task per child
+    # keeps config overrides (e.g. --gateway_down) from leaking between runs
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(workers, maxtasksperchild=1) as pool:
+        results = pool.map(_sweep_worker, configs)
+    
+    print(f"{'seed':>6} {'nodes':>5} {'loss':>6} {'DR':>8} {'FPR':>8} {'latency':>8}")
+    for r in results:
+        print(f"{r['seed']:>6} {r['nodes']:>5} {r['loss']:>6.2f} {r['detection_rate']:>8.2%} "
+              f"{r['false_positive_rate']:>8.2%} {r['mean_latency']:>7.3f}s")
+    print(f"\nResults written to {SWEEP_DIR}/")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dual-Ring LoRa Simulation")
+    parser.add_argument("--experiment", type=str, default="default", 
+                        choices=["default", "fpr", "latency", "gateway", "density"],
+                        help="Experiment mode to run")
+    parser.add_argument("--nodes", type=int, default=16, help="Total number of nodes (Density exp)")
+    parser.add_argument("--loss", type=float, default=config.LOSS_BASE, help="Base packet loss prob")
+    parser.add_argument("--timeout", type=float, default=config.P2P_VERIFICATION_TIMEOUT, help="P2P timeout")
+    parser.add_argument("--gateway_down", action="store_true", help="Force gateway down")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Run every seed x nodes x loss combination in parallel")
+    parser.add_argument("--sweep_seeds", type=int, nargs="+", default=[config.RANDOM_SEED],
+                        help="Seeds for --sweep")
+    parser.add_argument("--sweep_nodes", type=int, nargs="+", help="Node counts for --sweep (default: --nodes)")
+    parser.add_argument("--sweep_loss", type=float, nargs="+", help="Loss values for --sweep (default: --loss)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --sweep (default: CPU count)")
+    
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"DUAL-RING LoRa SIMULATION - Mode: {args.experiment.upper()}")
+    print("=" * 60)
+
+    if args.sweep:
+        return run_sweep(args)
     
-    # Auto-generate plots
-    output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "output")
-    generate_plots(metrics, output_dir)
+    run_one({"seed": config.RANDOM_SEED, "nodes": args.nodes, "loss": args.loss,
+            "timeout": args.timeout, "gateway_down": args.gateway_down})
     
     print("\nSimulation Finished.")
     return 0
 
 if __name__ == "__main__":
-    import math # Ensure math is imported
     sys.exit(main())
@@ -1,13 +1,14 @@
 # Dual-Ring LoRa Perimeter Simulation
 # Models: Node, Gateway, Environment, Network (Refactored for Networking Focus)
 
+import bisect
 import simpy
-import random
-import math
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 
+import numpy as np
+
 import config
 
 
@@ -16,7 +17,7 @@ class EventType(Enum):
     NOISE = "noise"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SensorEvent:
     """Represents an environmental event (intruder or noise)."""
     event_id: int
@@ -26,7 +27,7 @@ class SensorEvent:
     duration: float
 
 
-@dataclass
+@dataclass(slots=True)
 class DetectionRecord:
     """Record of a detection by the system."""
     event_id: int
@@ -41,7 +42,7 @@ class DetectionRecord:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageAnalysisResult:
     """Output from the abstracted Image Processing Module."""
     classification: str  # "wild_boar" or "other"
@@ -57,13 +58,13 @@ class ImageConfidenceGenerator:
         """Generate a confidence score based on empirical distributions."""
         timestamp = 0.0 # Placeholder, set by caller if needed
         
-        if event_type == EventType.INTRUDER:
+        if event_type is EventType.INTRUDER:
             # True Wild Boar: High confidence distribution
-            conf = random.gauss(config.IMG_BOAR_MEAN, config.IMG_BOAR_STD)
+            conf = config.RNG.normal(config.IMG_BOAR_MEAN, config.IMG_BOAR_STD)
             cls = "wild_boar"
         else:
             # Non-Boar (Noise/Confuser): Low confidence distribution
-            conf = random.gauss(config.IMG_NON_BOAR_MEAN, config.IMG_NON_BOAR_STD)
+            conf = config.RNG.normal(config.IMG_NON_BOAR_MEAN, config.IMG_NON_BOAR_STD)
             cls = "other"
             
         # Clamp to [0.0, 1.0]
@@ -74,21 +75,33 @@ class ImageConfidenceGenerator:
 class Gateway:
     """Gateway abstraction: tracks availability and receives uplinks."""
 
-    def __init__(self, env: simpy.Environment):
+    # Up/down cycles sampled per extension of the availability schedule
+    SCHEDULE_BLOCK = 64
+
+    def __init__(self, env: simpy.Environment, horizon: float = 0.0):
         self.env = env
-        self.is_up = True
         self.uplinks_received: List[Dict[str, Any]] = []
-        self.env.process(self._availability_process())
-
-    def _availability_process(self):
-        """Alternates gateway between up and down states."""
-        while True:
-            # Up phase
-            yield self.env.timeout(random.expovariate(1.0 / config.GATEWAY_UP_DURATION_MEAN))
-            self.is_up = False
-            # Down phase
-            yield self.env.timeout(random.expovariate(1.0 / config.GATEWAY_DOWN_DURATION_MEAN))
-            self.is_up = True
+        # End times of the alternating up/down phases, starting with up;
+        # sampled up front instead of toggled by a SimPy process
+        self._edges: List[float] = []
+        self._extend_schedule(horizon)
+
+    def _extend_schedule(self, until: float):
+        """Sample up/down phases, one vectorized draw per block, until past `until`."""
+        means = np.tile([config.GATEWAY_UP_DURATION_MEAN, config.GATEWAY_DOWN_DURATION_MEAN],
+                        self.SCHEDULE_BLOCK)
+        while not self._edges or self._edges[-1] <= until:
+            start = self._edges[-1] if self._edges else 0.0
+            self._edges += (start + np.cumsum(config.RNG.generator.exponential(means))).tolist()
+
+    @property
+    def is_up(self) -> bool:
+        """Whether the gateway is up at the current simulation time."""
+        now = self.env.now
+        if now >= self._edges[-1]:
+            self._extend_schedule(now)
+        # An even number of phase ends passed means an up phase
+        return bisect.bisect_right(self._edges, now) % 2 == 0
 
     def receive_uplink(self, node_id: str, event_id: int, time: float):
         """Receive an uplink from a node (if gateway is up)."""
@@ -110,6 +123,31 @@ class Gateway:
             return False
 
 
+def _sample_links(base_loss: List[float], base_delay: List[float], extra_loss: float,
+                  u: List[float], jitter: float) -> List[Tuple[int, float]]:
+    """Loss test and delay for each link of one broadcast.
+    
+    Args:
+        base_loss: Distance-dependent loss probability per link.
+        base_delay: Distance-dependent delay per link (s).
+        extra_loss: Loss probability added to every link (collisions).
+        u: 2 * len(base_loss) uniform [0, 1) draws: loss tests, then jitter.
+        jitter: Max absolute delay jitter (s).
+    
+    Returns:
+        (link index, delay) for every link whose packet was not lost.
+    """
+    k = len(base_loss)
+    delivered = []
+    for i in range(k):
+        if u[i] < base_loss[i] + extra_loss:
+            continue # Packet Lost
+        delay = base_delay[i] + (2.0 * u[k + i] - 1.0) * jitter
+        if delay < 0: delay = 0.01
+        delivered.append((i, delay))
+    return delivered
+
+
 class Network:
     """Wireless Networking Simulator (The Main Focus)."""
 
@@ -117,25 +155,74 @@ class Network:
         self.env = env
         self.gateway = gateway
         self.nodes: Dict[str, 'Node'] = {}
+        # Nodes by index (Node.idx); hot paths index this instead of self.nodes
+        self.node_list: List['Node'] = []
         self.all_detections: List[DetectionRecord] = []
         
         # Collision Tracking
         self.active_transmissions = 0
         self.collision_window_end = 0.0
+        
+        # Static topology: pairwise node distances, indexed by Node.idx
+        # (from set_distances, or computed from node positions on first use)
+        self.dist: List[List[float]] = []
+        # Per-sender link tables by node index, built on first broadcast (see _link_table)
+        self._links: List[Optional[Tuple[List['Node'], List[float], List[float]]]] = []
 
     def add_node(self, node: 'Node'):
+        node.idx = len(self.node_list)
         self.nodes[node.node_id] = node
+        self.node_list.append(node)
+        self._links.append(None)
+        self.dist = []
 
     def set_neighbors(self, neighbors_map: Dict[str, List[str]]):
+        """Set each node's neighbors, given by node ID, as node indices."""
         for node_id, neighbor_ids in neighbors_map.items():
             if node_id in self.nodes:
-                self.nodes[node_id].neighbors = neighbor_ids
+                self.nodes[node_id].neighbors = [self.nodes[nid].idx for nid in neighbor_ids]
+        self._links = [None] * len(self.node_list)
 
-    def p2p_broadcast(self, sender_id: str, message_type: str, payload: Any):
-        """Simulate P2P multicast to neighbors with realistic RF effects."""
-        sender = self.nodes[sender_id]
-        neighbors = sender.neighbors
+    def set_distances(self, xy: np.ndarray):
+        """Precompute the pairwise distance matrix for a static topology.
+        
+        Optional: without it the matrix is computed from node positions on
+        the first broadcast.
         
+        Args:
+            xy: (N, 2) array of node positions, in node index (add_node) order.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        d = np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(-1))
+        # Nested lists: per-packet lookups return Python floats
+        self.dist = d.tolist()
+        self._links = [None] * len(self.node_list)
+
+    def _link_table(self, sender_idx: int) -> Tuple[List['Node'], List[float], List[float]]:
+        """Receivers and distance-based loss/delay for one sender's links.
+        
+        Positions and neighbors are fixed once the topology is set, so each
+        sender's table is computed on its first broadcast and reused.
+        """
+        links = self._links[sender_idx]
+        if links is None:
+            if not self.dist:
+                self.set_distances([node.position for node in self.node_list])
+            sender = self.node_list[sender_idx]
+            receivers = [self.node_list[j] for j in sender.neighbors]
+            sender_dist = self.dist[sender_idx]
+            dists = [sender_dist[r.idx] for r in receivers]
+            links = self._links[sender_idx] = (
+                receivers,
+                # Loss Model
+                [config.LOSS_BASE + (config.LOSS_PER_METER * d) for d in dists],
+                # Delay Model (deterministic part; jitter is added per packet)
+                [config.DELAY_BASE + (config.DELAY_PER_METER * d) for d in dists],
+            )
+        return links
+
+    def p2p_broadcast(self, sender_idx: int, message_type: str, payload: Any):
+        """Simulate P2P multicast to neighbors with realistic RF effects."""
         # Determine message size for delay calculation
         if message_type == "VERIFY_REQ":
             size = config.MSG_SIZE_VERIFY_REQ
@@ -159,39 +246,45 @@ class Network:
         
         self.active_transmissions -= 1
 
-        for nid in neighbors:
-            receiver = self.nodes[nid]
-            
-            # Distance Calculation
-            sx, sy = sender.position
-            rx, ry = receiver.position
-            dist = math.sqrt((sx - rx)**2 + (sy - ry)**2)
-            
-            # Loss Model
-            p_loss = config.LOSS_BASE + (config.LOSS_PER_METER * dist) + collision_penalty
-            if random.random() < p_loss:
-                continue # Packet Lost
-                
-            # Delay Model
-            delay = config.DELAY_BASE + (config.DELAY_PER_METER * dist) + \
-                    random.uniform(-config.DELAY_JITTER, config.DELAY_JITTER)
-            if delay < 0: delay = 0.01
-            
-            # Schedule delivery
-            self.env.process(self._deliver_p2p(receiver, message_type, payload, delay))
-
-    def _deliver_p2p(self, receiver: 'Node', msg_type: str, payload: Any, delay: float):
-        yield self.env.timeout(delay)
-        receiver.receive_p2p_message(msg_type, payload)
-
-    def dispatch_event_to_nodes(self, event: SensorEvent):
-        """Dispatch event to nodes within sensor range."""
-        ex, ey = event.position
-        for node in self.nodes.values():
-            nx, ny = node.position
-            dist = math.sqrt((ex - nx) ** 2 + (ey - ny) ** 2)
-            if dist <= config.SENSOR_RANGE:
-                node.handle_sensor_event(event)
+        receivers, base_loss, base_delay = self._link_table(sender_idx)
+        # One generator call covers every link's loss test and jitter
+        u = config.RNG.uniforms(2 * len(receivers))
+        
+        delivered = _sample_links(base_loss, base_delay, collision_penalty, u, config.DELAY_JITTER)
+        if delivered:
+            # Schedule delivery: one process walks the links in delay order
+            delivered.sort(key=lambda link: link[1])
+            deliveries = [(receivers[i], delay) for i, delay in delivered]
+            self.env.process(self._deliver_p2p(deliveries, message_type, payload))
+
+    def _deliver_p2p(self, receivers: List[Tuple['Node', float]], msg_type: str, payload: Any):
+        """Deliver one broadcast to (receiver, delay) pairs sorted by delay."""
+        elapsed = 0.0
+        for receiver, delay in receivers:
+            yield self.env.timeout(delay - elapsed)
+            elapsed = delay
+            receiver.receive_p2p_message(msg_type, payload)
+
+    def sensor_hits(self, points: np.ndarray) -> List[List['Node']]:
+        """Nodes within sensor range of each event position.
+        
+        Args:
+            points: (M, 2) array of event positions.
+        
+        Returns:
+            One list of nodes per point, in node insertion order.
+        """
+        node_list = self.node_list
+        node_xy = np.array([node.position for node in node_list], dtype=np.float64).reshape(-1, 2)
+        delta = points[:, None, :] - node_xy[None, :, :]
+        # Squared here, not in config, so a runtime SENSOR_RANGE override applies
+        in_range = np.einsum('ijk,ijk->ij', delta, delta) <= config.SENSOR_RANGE ** 2
+        return [[node_list[j] for j in np.flatnonzero(row).tolist()] for row in in_range]
+
+    def notify_nodes(self, event: SensorEvent, nodes: List['Node']):
+        """Hand an event to the nodes that sensed it."""
+        for node in nodes:
+            node.handle_sensor_event(event)
 
     def report_detection(self, record: DetectionRecord):
         self.all_detections.append(record)
@@ -207,20 +300,21 @@ class Node:
         self.position = position
         self.gateway = gateway
         self.network = network
-        self.neighbors: List[str] = []
+        self.idx = -1  # assigned by Network.add_node
+        self.neighbors: List[int] = []  # neighbor node indices
         
         # Verification State
         self.verification_event: Optional[simpy.Event] = None
         self.pending_confirmations = 0
 
     def handle_sensor_event(self, event: SensorEvent):
-        """Process an event: Camera Capture -> Decision Logic."""
-        self.env.process(self._process_logic(event))
-
-    def _process_logic(self, event: SensorEvent):
+        """Process an event: Camera Capture -> Decision Logic.
+        
+        Tiers 1 and 3 never wait, so they run inline; only Tier 2 needs a
+        SimPy process for the verification round.
+        """
         # 1. Image Processing Abstraction
-        result = ImageConfidenceGenerator.analyze(event.event_type)
-        confidence = result.confidence
+        confidence = ImageConfidenceGenerator.analyze(event.event_type).confidence
         
         # 2. Decision Policy
         # Tier 1: High Confidence -> Immediate Uplink
@@ -229,16 +323,14 @@ class Node:
             
         # Tier 2: Medium Confidence -> P2P Verification
         elif confidence >= config.VERIFY_THRESHOLD:
-            yield from self._run_verification_protocol(event, confidence)
+            self.env.process(self._run_verification_protocol(event, confidence))
             
         # Tier 3: Low Confidence -> Ignore
-        else:
-            return # Ignore
-            
+
     def _run_verification_protocol(self, event: SensorEvent, confidence: float):
         """Execute P2P verification (Tier 2)."""
         # Broadcast VERIFY_REQ
-        yield from self.network.p2p_broadcast(self.node_id, "VERIFY_REQ", event)
+        yield from self.network.p2p_broadcast(self.idx, "VERIFY_REQ", event)
         
         # Wait for responses
         self.pending_confirmations = 0
@@ -266,7 +358,7 @@ class Node:
             if my_reading.confidence >= config.CONFIRM_THRESHOLD:
                  # Send VERIFY_RESP
                  self.env.process(
-                     self.network.p2p_broadcast(self.node_id, "VERIFY_RESP", payload)
+                     self.network.p2p_broadcast(self.idx, "VERIFY_RESP", payload)
                  )
         
         elif msg_type == "VERIFY_RESP":
@@ -291,12 +383,27 @@ class Node:
             p2p_messages_sent=p2p_msgs, # Captures only this node's contribution
             gateway_was_up=gw_success,
             latency=detection_time - event.time,
-            is_true_positive=(event.event_type == EventType.INTRUDER),
+            is_true_positive=(event.event_type is EventType.INTRUDER),
             confidence=confidence
         )
         self.network.report_detection(record)
 
 
+def _sample_events(count: int, rng: np.random.Generator):
+    """Draw every event's attributes up front, one vectorized call each.
+    
+    Returns:
+        (intervals, is_intruder, points, durations): inter-arrival times and
+        intruder flags as lists, event positions as a (count, 2) array, and
+        event durations as a list.
+    """
+    intervals = rng.exponential(config.EVENT_INTERVAL_MEAN, count).tolist()
+    is_intruder = (rng.random(count) < config.INTRUDER_EVENT_PROB).tolist()
+    points = rng.uniform(-25, 25, (count, 2))
+    durations = rng.uniform(1, 5, count).tolist()
+    return intervals, is_intruder, points, durations
+
+
 class Environment:
     """Simulation environment: generates events."""
 
@@ -310,20 +417,23 @@ class Environment:
         self.env.process(self._event_generator(count))
 
     def _event_generator(self, count: int):
-        for _ in range(count):
-            interval = random.expovariate(1.0 / config.EVENT_INTERVAL_MEAN)
-            yield self.env.timeout(interval)
+        intervals, is_intruder, points, durations = _sample_events(count, config.RNG.generator)
+        # Sensor-range test for every event at once; the loop only indexes it
+        hits = self.network.sensor_hits(points)
+        positions = list(map(tuple, points.tolist()))
+        
+        for i in range(count):
+            yield self.env.timeout(intervals[i])
 
-            is_intruder = random.random() < config.INTRUDER_EVENT_PROB
-            event_type = EventType.INTRUDER if is_intruder else EventType.NOISE
+            event_type = EventType.INTRUDER if is_intruder[i] else EventType.NOISE
             
             event = SensorEvent(
                 event_id=self.event_counter,
                 event_type=event_type,
                 time=self.env.now,
-                position=(random.uniform(-25, 25), random.uniform(-25, 25)),
-                duration=random.uniform(1, 5)
+                position=positions[i],
+                duration=durations[i]
             )
             self.events.append(event)
             self.event_counter += 1
-            self.network.dispatch_event_to_nodes(event)
+            self.network.notify_nodes(event, hits[i])
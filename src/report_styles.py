@@ -0,0 +1,232 @@
+"""
+Shared ReportLab styles for the PDF reports.
+
+Paragraph styles, colors, table styles and the page template are built once
+at import and reused by every report build. Static tables get their row
+heights measured once and passed explicitly afterwards, and static
+paragraphs are parsed once and handed out as copies.
+"""
+
+import copy
+import functools
+
+from _report_common import (
+    colors, A4, cm, getSampleStyleSheet, ParagraphStyle, TA_JUSTIFY,
+    BaseDocTemplate, Frame, PageTemplate, Paragraph, Table, TableStyle
+)
+
+# --- Colors ---
+WHITE = colors.white
+NAVY = colors.HexColor('#1a365d')
+BLUE_DARK = colors.HexColor('#2c5282')
+BLUE = colors.HexColor('#2b6cb0')
+BLUE_LIGHT = colors.HexColor('#4299e1')
+GRAY_DARK = colors.HexColor('#2d3748')
+GRAY = colors.HexColor('#4a5568')
+GRAY_BORDER = colors.HexColor('#a0aec0')
+GRAY_LINE = colors.HexColor('#cbd5e0')
+GRAY_FILL = colors.HexColor('#edf2f7')
+GREEN_DARK = colors.HexColor('#276749')
+GREEN = colors.HexColor('#2f855a')
+GREEN_BORDER = colors.HexColor('#68d391')
+GREEN_LINE = colors.HexColor('#9ae6b4')
+GREEN_FILL = colors.HexColor('#f0fff4')
+SKY_FILL = colors.HexColor('#ebf8ff')
+SKY_LINE = colors.HexColor('#bee3f8')
+ORANGE = colors.HexColor('#c05621')
+ORANGE_LINE = colors.HexColor('#fbd38d')
+CODE_FILL = colors.HexColor('#f7fafc')
+CODE_BORDER = colors.HexColor('#e2e8f0')
+
+
+def _build_styles(title_color, heading2_color):
+    """Sample stylesheet plus the custom report styles."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        name='Title_Custom',
+        parent=styles['Title'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=title_color
+    ))
+    styles.add(ParagraphStyle(
+        name='Heading1_Custom',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceBefore=20,
+        spaceAfter=10,
+        textColor=BLUE_DARK
+    ))
+    styles.add(ParagraphStyle(
+        name='Heading2_Custom',
+        parent=styles['Heading2'],
+        fontSize=13,
+        spaceBefore=15,
+        spaceAfter=8,
+        textColor=heading2_color
+    ))
+    styles.add(ParagraphStyle(
+        name='Body_Custom',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=8,
+        alignment=TA_JUSTIFY
+    ))
+    styles.add(ParagraphStyle(
+        name='Code_Custom',
+        parent=styles['Code'],
+        fontSize=9,
+        backColor=CODE_FILL,
+        borderColor=CODE_BORDER,
+        borderWidth=1,
+        borderPadding=5,
+        spaceAfter=10
+    ))
+    return styles
+
+
+# Simulation report and network report differ only in title/subheading color
+STYLES = _build_styles(NAVY, BLUE)
+NETWORK_STYLES = _build_styles(BLUE, BLUE_LIGHT)
+
+# --- Table styles (simulation report) ---
+HEADER_BLUE_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BLUE_DARK),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), GRAY_FILL),
+    ('LINEBELOW', (0, 0), (-1, 0), 1, GRAY_LINE),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('TOPPADDING', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+])
+
+HEADER_GRAY_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GRAY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, GRAY_BORDER),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Key/value tables: labels left-aligned, values centered
+HEADER_GREEN_KV_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GREEN_DARK),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, GREEN_BORDER),
+    ('BACKGROUND', (0, 1), (-1, -1), GREEN_FILL),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+])
+
+# --- Table styles (network report) ---
+HEADER_SKY_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), BLUE_DARK),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), SKY_FILL),
+    ('GRID', (0, 0), (-1, -1), 1, SKY_LINE),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+])
+
+HEADER_SLATE_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GRAY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, GRAY_LINE),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+])
+
+HEADER_GREEN_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GREEN),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('GRID', (0, 0), (-1, -1), 1, GREEN_LINE),
+])
+
+HEADER_ORANGE_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), ORANGE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('GRID', (0, 0), (-1, -1), 1, ORANGE_LINE),
+])
+
+HEADER_DARK_TS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), GRAY_DARK),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('GRID', (0, 0), (-1, -1), 1, GRAY_LINE),
+])
+
+
+# --- Page layout ---
+# A4 with 2 cm margins on every side: one frame, one template for all pages
+PAGE_MARGIN = 2*cm
+PAGE_TEMPLATE = PageTemplate(id='normal', frames=[
+    Frame(PAGE_MARGIN, PAGE_MARGIN, A4[0] - 2*PAGE_MARGIN, A4[1] - 2*PAGE_MARGIN, id='normal')
+])
+
+
+def make_doc(output_path: str) -> BaseDocTemplate:
+    """A4 document using the shared page template, with compressed page streams."""
+    return BaseDocTemplate(
+        output_path,
+        pagesize=A4,
+        pageCompression=1,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        pageTemplates=[PAGE_TEMPLATE]
+    )
+
+
+# --- Static tables ---
+# Measured row heights per (data, column widths, style), so later builds of
+# the same table skip Platypus's per-cell height measurement
+_ROW_HEIGHTS = {}
+
+
+def static_table(data, col_widths, style: TableStyle) -> Table:
+    """Build a text-only Table with explicit, memoized row heights."""
+    key = (tuple(map(tuple, data)), tuple(col_widths), id(style))
+    heights = _ROW_HEIGHTS.get(key)
+    if heights is None:
+        probe = Table(data, colWidths=col_widths)
+        probe.setStyle(style)
+        probe.wrap(PAGE_TEMPLATE.frames[0]._aW, A4[1])
+        heights = _ROW_HEIGHTS[key] = list(probe._rowHeights)
+    table = Table(data, colWidths=col_widths, rowHeights=heights)
+    table.setStyle(style)
+    return table
+
+
+# --- Static paragraphs ---
+@functools.lru_cache(maxsize=None)
+def _parsed_para(text: str, style: ParagraphStyle) -> Paragraph:
+    """Parse a paragraph's markup once per (text, style)."""
+    return Paragraph(text, style)
+
+
+def static_para(text: str, style: ParagraphStyle) -> Paragraph:
+    """Paragraph for fixed text, reusing the parsed markup.
+    
+    Layout state is per instance, so each call returns a shallow copy of the
+    cached paragraph; only the parsed fragments are shared.
+    """
+    return copy.copy(_parsed_para(text, style))
+
+
+def kv_para(label: str, value: str, style: ParagraphStyle) -> Paragraph:
+    """One "label  value" line, a lighter stand-in for a two-column table row."""
+    return static_para(f"<b>{label}</b>&nbsp;&nbsp;{value}", style)
@@ -19,9 +19,15 @@ PIR_DELAY = 1.0        # Time to wake up
 THERMAL_DELAY = 0.5    # Time to verify heat signature
 CAMERA_DELAY = 0.8     # Time to capture & classify
 VOTING_TIMEOUT = 3.0   # Time to wait for neighbors
+ALERT_DURATION = 5.0   # Time an alerting node stays in ALERT
 
 # --- Ranges (Pixels) ---
 SENSOR_RANGE = 100      # Visual/Logic range for detection (Matched to DEPTH)
+NEIGHBOR_RANGE = 120    # Neighbor range for voting (12m -> 120px)
+
+# Squared ranges, for sqrt-free distance checks
+SENSOR_RANGE_SQ = SENSOR_RANGE ** 2
+NEIGHBOR_RANGE_SQ = NEIGHBOR_RANGE ** 2
 
 # --- Battery Consumption (Percentage Drops) ---
 BATTERY_DRAIN_IDLE = 0.001
@@ -1,7 +1,6 @@
 # web/fsm.py
 import random
 import time
-import eventlet
 from config_mirror import *
 
 class NodeFSM:
@@ -21,21 +20,26 @@ class NodeFSM:
         self.current_event_id = None
         self.votes_received = 0
         self.neighbors = []
+        
+        # Tick-driven stage timer: advance() leaves the current stage once
+        # time.monotonic() passes this deadline (None while IDLE)
+        self.deadline = None
 
     def set_neighbors(self, neighbors):
         self.neighbors = neighbors
 
     def trigger_event(self, intrusion_type, event_id):
-        """External trigger (e.g., mouse click)"""
+        """External trigger (e.g., mouse click); returns whether the node started"""
         if self.state != "IDLE":
-            return # Busy
+            return False # Busy
         
         self.active_intrusion_type = intrusion_type
         self.current_event_id = event_id
         self.transition_to("PIR")
         
-        # Start async FSM loop
-        eventlet.spawn(self._run_fsm_cycle)
+        # Stages are advanced by SimulationManager.tick(), no green thread
+        self.deadline = time.monotonic() + PIR_DELAY
+        return True
 
     def transition_to(self, new_state):
         self.state = new_state
@@ -58,48 +62,61 @@ class NodeFSM:
         # The SimulationManager will gather states.
         pass
 
-    def _run_fsm_cycle(self):
-        """Async Logic Flow"""
+    def advance(self, now):
+        """Run every stage whose deadline has passed by `now` (monotonic seconds).
         
-        # 1. PIR Stage
-        eventlet.sleep(PIR_DELAY)
+        Each stage's deadline is measured from the previous one, so a late
+        tick catches up without stretching the stage timings.
+        """
+        while self.deadline is not None and now >= self.deadline:
+            self._finish_stage()
+
+    def _finish_stage(self):
+        """Leave the current stage: the next step of the logic flow"""
         
-        # False Alarm Check (PIR is sensitive, triggers often)
-        # Proceed to Thermal
-        self.transition_to("THERMAL")
-        eventlet.sleep(THERMAL_DELAY)
+        # 1. PIR Stage
+        if self.state == "PIR":
+            # False Alarm Check (PIR is sensitive, triggers often)
+            # Proceed to Thermal
+            self.transition_to("THERMAL")
+            self.deadline += THERMAL_DELAY
         
         # 2. Thermal Stage
-        if self.active_intrusion_type == 'false_alarm':
-            # 50% chance to fail here (e.g., wind has no heat)
-            if random.random() < 0.5:
-                self._reset()
-                return
-        
-        self.transition_to("CAMERA")
-        eventlet.sleep(CAMERA_DELAY)
+        elif self.state == "THERMAL":
+            if self.active_intrusion_type == 'false_alarm':
+                # 50% chance to fail here (e.g., wind has no heat)
+                if random.random() < 0.5:
+                    self._reset()
+                    return
+            self.transition_to("CAMERA")
+            self.deadline += CAMERA_DELAY
         
         # 3. Camera Stage
-        if self.active_intrusion_type == 'false_alarm':
-            # 90% chance to fail here (AI sees no boar)
-            if random.random() < 0.9:
-                self._reset()
-                return
+        elif self.state == "CAMERA":
+            if self.active_intrusion_type == 'false_alarm':
+                # 90% chance to fail here (AI sees no boar)
+                if random.random() < 0.9:
+                    self._reset()
+                    return
 
-        # 4. Voting Stage
-        self.transition_to("VOTING")
-        self.request_votes()
-        
-        # Wait for votes
-        eventlet.sleep(VOTING_TIMEOUT)
+            # 4. Voting Stage
+            self.transition_to("VOTING")
+            self.request_votes()
+            
+            # Wait for votes
+            self.deadline += VOTING_TIMEOUT
         
         # Final Decision
-        if self.votes_received >= VOTE_CONFIRM_THRESHOLD:
-            self.transition_to("ALERT")
-            self.manager.report_alert(self.active_intrusion_type, self.current_event_id)
-            eventlet.sleep(5.0) # Stay alerting for 5s
+        elif self.state == "VOTING":
+            if self.votes_received >= VOTE_CONFIRM_THRESHOLD:
+                self.transition_to("ALERT")
+                self.manager.report_alert(self.active_intrusion_type, self.current_event_id)
+                self.deadline += ALERT_DURATION # Stay alerting for 5s
+            else:
+                self._reset()
         
-        self._reset()
+        else:
+            self._reset()
 
     def request_votes(self):
         """Simulate P2P Voting"""
@@ -119,6 +136,7 @@ class NodeFSM:
 
     def _reset(self):
         self.state = "IDLE"
+        self.deadline = None
         self.active_intrusion_type = None
         self.votes_received = 0
         self._emit_update()
@@ -2,12 +2,26 @@
 from flask import Flask, render_template, send_from_directory
 from flask_socketio import SocketIO, emit
 import eventlet
+import orjson
 import os
 
+
+class OrjsonCodec:
+    """orjson behind the json-module interface Flask-SocketIO expects (str output)"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask + SocketIO
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
-socketio = SocketIO(app, async_mode='eventlet')
+socketio = SocketIO(app, async_mode='eventlet', json=OrjsonCodec)
 
 # Initialize Simulation Manager
 from simulation_manager import SimulationManager
@@ -58,8 +72,9 @@ def handle_injection(data):
 def background_loop():
     while True:
         socketio.sleep(0.1) # 10Hz update rate
-        state = sim_manager.get_system_state()
-        socketio.emit('state_update', state)
+        sim_manager.tick()
+        # Changed nodes only; full state goes out once per client on connect
+        socketio.emit('state_delta', sim_manager.get_state_delta())
 
 if __name__ == '__main__':
     print("Starting Interactive Simulator on http://localhost:5000")
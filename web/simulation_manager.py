@@ -1,8 +1,19 @@
 # web/simulation_manager.py
-import math
+import heapq
+import itertools
+import time
+
+import numpy as np
+
 from config_mirror import *
 from fsm import NodeFSM
 
+# Optional KD-tree for the neighbor search; dense pairwise matrix otherwise
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
 class SimulationManager:
     def __init__(self, socketio):
         self.socketio = socketio
@@ -19,40 +30,54 @@ class SimulationManager:
         }
         self.current_event_id = 0
         
+        # Last (state, battery) broadcast per node, for get_state_delta
+        self._last_sent = {}
+        
+        # Busy nodes keyed by stage deadline: (deadline, seq, node)
+        self._due = []
+        self._seq = itertools.count()
+        
         self._init_nodes()
 
     def _init_nodes(self):
-        # Create Outer Ring
-        for i in range(NODE_COUNT_OUTER):
-            nid = f"outer_{i}"
-            self.nodes[nid] = NodeFSM(nid, "outer", self.socketio, self)
+        # Ring angles for both rings at once, outer ring first
+        outer_angles = np.arange(NODE_COUNT_OUTER) * (360 / NODE_COUNT_OUTER)
+        inner_angles = np.arange(NODE_COUNT_INNER) * (360 / NODE_COUNT_INNER) + INNER_RING_OFFSET
+        angles = np.concatenate((outer_angles, inner_angles))
+        radii = np.repeat([OUTER_RING_RADIUS, INNER_RING_RADIUS], [NODE_COUNT_OUTER, NODE_COUNT_INNER])
+        rad = np.radians(angles)
+        
+        # Node positions as one (N, 2) array, parallel to self._node_list
+        self._xy = np.column_stack((radii * np.cos(rad), radii * np.sin(rad)))
+        ids = [f"outer_{i}" for i in range(NODE_COUNT_OUTER)] + [f"inner_{i}" for i in range(NODE_COUNT_INNER)]
+        rings = ["outer"] * NODE_COUNT_OUTER + ["inner"] * NODE_COUNT_INNER
+        
+        for nid, ring, (x, y), angle in zip(ids, rings, self._xy.tolist(), angles.tolist()):
+            node = NodeFSM(nid, ring, self.socketio, self)
             # Assign geometric properties (for distance calc)
-            angle = i * (360 / NODE_COUNT_OUTER)
-            rad = math.radians(angle)
-            self.nodes[nid].x = OUTER_RING_RADIUS * math.cos(rad)
-            self.nodes[nid].y = OUTER_RING_RADIUS * math.sin(rad)
-            self.nodes[nid].angle = angle  # Store angle for FOV
-
-        # Create Inner Ring
-        for i in range(NODE_COUNT_INNER):
-            nid = f"inner_{i}"
-            self.nodes[nid] = NodeFSM(nid, "inner", self.socketio, self)
-            angle = i * (360 / NODE_COUNT_INNER) + INNER_RING_OFFSET
-            rad = math.radians(angle)
-            self.nodes[nid].x = INNER_RING_RADIUS * math.cos(rad)
-            self.nodes[nid].y = INNER_RING_RADIUS * math.sin(rad)
-            self.nodes[nid].angle = angle  # Store angle for FOV
+            node.x = x
+            node.y = y
+            node.angle = angle  # Store angle for FOV
+            self.nodes[nid] = node
+        self._node_list = list(self.nodes.values())
+        # Static per-node fields, merged into every full snapshot
+        self._static_fields = [{"id": n.id, "x": n.x, "y": n.y, "angle": n.angle}
+                               for n in self._node_list]
             
         # Compute Neighbors (Simple distance based)
-        for nid, node in self.nodes.items():
-            neighbors = []
-            for other_id, other in self.nodes.items():
-                if nid == other_id: continue
-                dist = math.sqrt((node.x - other.x)**2 + (node.y - other.y)**2)
-                # Assume range covers adjacent nodes ~100px (approx 30m scaled)
-                if dist < 120: 
-                    neighbors.append(other)
-            node.set_neighbors(neighbors)
+        # Assume range covers adjacent nodes ~100px (approx 30m scaled)
+        for i, (node, idx) in enumerate(zip(self._node_list, self._neighbor_indices())):
+            node.set_neighbors([self._node_list[j] for j in idx if j != i])
+
+    def _neighbor_indices(self):
+        """Sorted indices of the nodes strictly within NEIGHBOR_RANGE of each node (self included)."""
+        if cKDTree is not None:
+            # Ball query is inclusive; step just inside the range to keep "<"
+            radius = np.nextafter(NEIGHBOR_RANGE, 0)
+            return [sorted(idx) for idx in cKDTree(self._xy).query_ball_point(self._xy, r=radius)]
+        delta = self._xy[:, None, :] - self._xy[None, :, :]
+        in_range = np.einsum('ijk,ijk->ij', delta, delta) < NEIGHBOR_RANGE_SQ
+        return [np.flatnonzero(row).tolist() for row in in_range]
 
     def inject_event(self, x, y, type):
         """Trigger nodes near the click location"""
@@ -63,13 +88,27 @@ class SimulationManager:
         else:
             self.stats['noise_injections'] += 1
             
-        triggered_count = 0
-        for node in self.nodes.values():
-            dist = math.sqrt((node.x - x)**2 + (node.y - y)**2)
-            if dist < SENSOR_RANGE: # Sensor Range
-                node.trigger_event(type, self.current_event_id)
-                triggered_count += 1
-        return triggered_count
+        # Squared distances to every node in one pass
+        delta = self._xy - (x, y)
+        hits = np.flatnonzero(np.einsum('ij,ij->i', delta, delta) < SENSOR_RANGE_SQ)
+        for j in hits.tolist():
+            node = self._node_list[j]
+            if node.trigger_event(type, self.current_event_id):
+                heapq.heappush(self._due, (node.deadline, next(self._seq), node))
+        return len(hits)
+
+    def tick(self):
+        """Advance the FSMs of nodes whose stage deadline has passed"""
+        now = time.monotonic()
+        due = self._due
+        # Only due nodes are touched; idle and waiting nodes cost nothing
+        while due and due[0][0] <= now:
+            deadline, _, node = heapq.heappop(due)
+            if node.deadline != deadline:
+                continue # Stale entry
+            node.advance(now)
+            if node.deadline is not None:
+                heapq.heappush(due, (node.deadline, next(self._seq), node))
 
     def report_alert(self, type, event_id):
         """Called by NodeFSM when it alerts"""
@@ -82,8 +121,8 @@ class SimulationManager:
              # For false alarms, every alert is bad, but usually we just track rate
              self.stats['false_alerts'] += 1
 
-    def get_system_state(self):
-        """Snapshot for Frontend"""
+    def _summary(self):
+        """Alert level and detection/false-positive rates"""
         # Check global alert level
         active_alerts = [n for n in self.nodes.values() if n.state == "ALERT"]
         if len(active_alerts) > 1:
@@ -103,19 +142,33 @@ class SimulationManager:
             fpr = (self.stats['false_alerts'] / self.stats['noise_injections']) * 100
 
         return {
-            "nodes": [
-                {
-                    "id": n.id,
-                    "state": n.state,
-                    "battery": round(n.battery, 1),
-                    "x": n.x, 
-                    "y": n.y,
-                    "angle": n.angle  # For FOV rendering
-                } for n in self.nodes.values()
-            ],
             "alert_level": self.alert_level,
             "stats": {
                 "detection_rate": round(dr, 1),
                 "fp_rate": round(fpr, 1)
             }
         }
+
+    def get_system_state(self):
+        """Snapshot for Frontend"""
+        return {
+            "nodes": [
+                {**static, "state": n.state, "battery": round(n.battery, 1)}
+                for static, n in zip(self._static_fields, self._node_list)
+            ],
+            **self._summary()
+        }
+
+    def get_state_delta(self):
+        """Per-tick update: only nodes whose state or shown battery changed.
+        
+        Positions and angles are static, so clients get them once from the
+        full get_system_state() snapshot on connect.
+        """
+        changed = []
+        for n in self.nodes.values():
+            current = (n.state, round(n.battery, 1))
+            if self._last_sent.get(n.id) != current:
+                self._last_sent[n.id] = current
+                changed.append({"id": n.id, "state": current[0], "battery": current[1]})
+        return {"nodes": changed, **self._summary()}
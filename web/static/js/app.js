@@ -152,8 +152,29 @@ socket.on('disconnect', () => {
     document.getElementById('connectionStatus').style.color = "red";
 });
 
+// Latest full record per node id; deltas are merged into it
+const nodeState = new Map();
+
+// Full snapshot (sent on connect): positions, angles and states
 socket.on('state_update', (data) => {
-    renderNodes(data.nodes);
+    nodeState.clear();
+    data.nodes.forEach(node => nodeState.set(node.id, node));
+    renderNodes(Array.from(nodeState.values()));
+    updateAlertLevel(data.alert_level);
+    updateChart(data.stats);
+});
+
+// Per-tick update: only nodes whose state or battery changed
+socket.on('state_delta', (data) => {
+    let changed = false;
+    data.nodes.forEach(delta => {
+        const node = nodeState.get(delta.id);
+        if (node) {
+            Object.assign(node, delta);
+            changed = true;
+        }
+    });
+    if (changed) renderNodes(Array.from(nodeState.values()));
     updateAlertLevel(data.alert_level);
     updateChart(data.stats);
 });
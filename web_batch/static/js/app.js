@@ -170,7 +170,10 @@ class SimulatorApp {
     
     async loadResults() {
         try {
-            const response = await fetch(`/api/jobs/${this.currentJobId}/results`);
+            // embed=1 asks the server to inline metrics.json in the response
+            const response = await fetch(`/api/jobs/${this.currentJobId}/results`, {
+                headers: { 'Accept': 'application/json; embed=1' }
+            });
             const data = await response.json();
             
             if (!data.success) {